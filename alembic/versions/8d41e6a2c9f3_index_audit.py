@@ -0,0 +1,48 @@
+"""index audit: drop redundant id indexes, index reverse RBAC and role lookups
+
+Revision ID: 8d41e6a2c9f3
+Revises: 5b2f0c9d41a7
+Create Date: 2026-10-18 14:03:27.551918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41e6a2c9f3'
+down_revision: Union[str, Sequence[str], None] = '5b2f0c9d41a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Primary keys are already indexed, so these only cost writes and space
+REDUNDANT_ID_INDEXES = (
+    'modules',
+    'permissions',
+    'roles',
+    'resources',
+    'users',
+    'role_resource_permissions',
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in REDUNDANT_ID_INDEXES:
+        op.drop_index(op.f(f'ix_{table}_id'), table_name=table)
+    op.create_index(
+        'ix_role_resource_permissions_resource_permission',
+        'role_resource_permissions',
+        ['resource_id', 'permission_id', 'role_id'],
+        unique=False,
+    )
+    op.create_index('ix_users_role_id', 'users', ['role_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_role_id', table_name='users')
+    op.drop_index('ix_role_resource_permissions_resource_permission', table_name='role_resource_permissions')
+    for table in REDUNDANT_ID_INDEXES:
+        op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
@@ -0,0 +1,65 @@
+"""add ota rollouts
+
+Revision ID: a9c4e2d7b615
+Revises: f3b8d2a6c1e4
+Create Date: 2026-10-19 09:12:40.630118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c4e2d7b615'
+down_revision: Union[str, Sequence[str], None] = 'f3b8d2a6c1e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ota_rollouts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.String(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('waves', sa.String(), nullable=False),
+    sa.Column('wave', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('ota_scheduler_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('egress_tokens', sa.Float(), nullable=False),
+    sa.Column('refilled_at', sa.Float(), nullable=False),
+    sa.Column('release_seq', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('ota_targets',
+    sa.Column('rollout_id', sa.Integer(), nullable=False),
+    sa.Column('device_id', sa.String(), nullable=False),
+    sa.Column('wave', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('state', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('release_seq', sa.Integer(), nullable=True),
+    sa.Column('lease_expires_at', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['rollout_id'], ['ota_rollouts.id'], ),
+    sa.PrimaryKeyConstraint('rollout_id', 'device_id')
+    )
+    op.create_index('ix_ota_targets_state_release', 'ota_targets', ['state', 'release_seq', 'rank'], unique=False)
+    op.create_index('ix_ota_targets_device_state', 'ota_targets', ['device_id', 'state'], unique=False)
+    op.create_index('ix_ota_targets_rollout_wave', 'ota_targets', ['rollout_id', 'wave', 'state'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ota_targets_rollout_wave', table_name='ota_targets')
+    op.drop_index('ix_ota_targets_device_state', table_name='ota_targets')
+    op.drop_index('ix_ota_targets_state_release', table_name='ota_targets')
+    op.drop_table('ota_targets')
+    op.drop_table('ota_scheduler_state')
+    op.drop_table('ota_rollouts')
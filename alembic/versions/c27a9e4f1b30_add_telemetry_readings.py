@@ -0,0 +1,37 @@
+"""add telemetry readings
+
+Revision ID: c27a9e4f1b30
+Revises: 8d41e6a2c9f3
+Create Date: 2026-10-18 16:20:51.093417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c27a9e4f1b30'
+down_revision: Union[str, Sequence[str], None] = '8d41e6a2c9f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('telemetry_readings',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('device_id', sa.String(), nullable=False),
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('ts_ms', sa.BigInteger(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_telemetry_readings_device_metric_ts', 'telemetry_readings', ['device_id', 'metric', 'ts_ms'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_telemetry_readings_device_metric_ts', table_name='telemetry_readings')
+    op.drop_table('telemetry_readings')
@@ -0,0 +1,39 @@
+"""add cleaning logs
+
+Revision ID: f3b8d2a6c1e4
+Revises: e5a1f7c3b920
+Create Date: 2026-10-18 20:05:33.184026
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d2a6c1e4'
+down_revision: Union[str, Sequence[str], None] = 'e5a1f7c3b920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cleaning_logs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('device_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('cleaned_at', sa.DateTime(), nullable=False),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_cleaning_logs_device_id', 'cleaning_logs', ['device_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_cleaning_logs_device_id', table_name='cleaning_logs')
+    op.drop_table('cleaning_logs')
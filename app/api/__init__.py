@@ -1 +1,7 @@
 from .user import router as user_router
+from .internal import router as internal_router
+from .metrics import router as metrics_router
+from .telemetry import router as telemetry_router
+from .firmware import router as firmware_router
+from .ota import router as ota_router
+from .cleaning import router as cleaning_router
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import require_permission
+from app.db.routing import read_your_writes, remember_write
+from app.db.session import get_db
+from app.models.cleaning import CleaningLog
+from app.models.user import User
+from app.schemas.cleaning import CleaningLogCreate, CleaningLogRead
+from app.services.cleaning_log import cleaning_log_committer
+
+router = APIRouter(prefix="/cleaning", tags=["cleaning"])
+
+@router.post("/logs", status_code=status.HTTP_201_CREATED, response_model=CleaningLogRead)
+async def register_clean(body: CleaningLogCreate, user: User = Depends(require_permission("cleaning_screen", "register"))):
+    """Record a clean; responds once the log is committed, sharing the transaction with concurrent logs."""
+    cleaned_at = body.cleaned_at or datetime.now(timezone.utc)
+    if cleaned_at.tzinfo is not None:
+        cleaned_at = cleaned_at.astimezone(timezone.utc).replace(tzinfo=None)
+    row = {"device_id": body.device_id, "user_id": user.id, "cleaned_at": cleaned_at, "notes": body.notes}
+    row_id = await cleaning_log_committer.submit(row)
+    remember_write(f"cleaning:{body.device_id}")
+    return {"id": row_id, **row}
+
+@router.get("/logs", response_model=List[CleaningLogRead])
+async def list_cleans(
+    device_id: str,
+    before_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
+    user=Depends(require_permission("cleaning_screen", "view")),
+    db: AsyncSession = Depends(get_db),
+):
+    """A device's cleaning history, newest first; pass the last id seen as ``before_id`` for the next page."""
+    read_your_writes(db, f"cleaning:{device_id}")
+    query = select(CleaningLog).where(CleaningLog.device_id == device_id)
+    if before_id is not None:
+        query = query.where(CleaningLog.id < before_id)
+    return (await db.scalars(query.order_by(CleaningLog.id.desc()).limit(limit))).all()
@@ -0,0 +1,78 @@
+import hashlib
+import time
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import verify_token
+from app.db.routing import read_your_writes
+from app.db.session import get_db
+from app.models.user import User
+from app.services import permission_matrix
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
+
+# Decoded access-token claims keyed by token digest; entries never outlive the token's exp
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
+# Detached User rows keyed by id; assign_role invalidates through invalidate_user
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+def _credentials_exception():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def decode_access_token(token: str):
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+    payload = verify_token(token)
+    if not payload or payload.get("type") == "refresh":
+        return None
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(key, payload, ttl=exp - time.time())
+    return payload
+
+def invalidate_user(user_id: int):
+    user_cache.pop(user_id)
+
+async def get_cached_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    """Return a detached User row, hitting the DB at most once per USER_CACHE_TTL."""
+    user = user_cache.get(user_id)
+    if user is None:
+        read_your_writes(db, f"user:{user_id}")
+        user = await db.get(User, user_id)
+        if user is None:
+            return None
+        db.expunge(user)
+        user_cache.set(user_id, user)
+    return user
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
+    payload = decode_access_token(token)
+    if payload is None or payload.get("user_id") is None:
+        raise _credentials_exception()
+    user = await get_cached_user(db, payload["user_id"])
+    if user is None:
+        raise _credentials_exception()
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    return user
+
+def require_permission(resource: str, permission: str):
+    async def dependency(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)) -> User:
+        if not await permission_matrix.has_permission(db, user.role_id, resource, permission):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Missing '{permission}' permission on '{resource}'",
+            )
+        return user
+    return dependency
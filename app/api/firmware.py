@@ -0,0 +1,86 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import require_permission
+from app.core.responses import ZeroCopyFileResponse
+from app.db.routing import use_primary
+from app.db.session import get_db
+from app.models.firmware import FirmwareArtifact
+from app.models.user import User
+from app.schemas.firmware import FirmwareArtifactOut
+from app.services.catalog_cache import etag_matches
+from app.services.firmware_store import ArtifactTooLarge, firmware_store
+
+router = APIRouter(prefix="/firmware", tags=["firmware"])
+
+@router.post(
+    "",
+    status_code=status.HTTP_201_CREATED,
+    response_model=FirmwareArtifactOut,
+    openapi_extra={"requestBody": {"required": True, "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}}}},
+)
+async def upload_firmware(
+    request: Request,
+    response: Response,
+    version: str = Query(min_length=1, max_length=64),
+    filename: Optional[str] = Query(None, max_length=255),
+    user: User = Depends(require_permission("firmware_update", "upload_firmware")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream a raw image body into the store and record it.
+
+    Re-uploading bytes that are already stored returns the existing record with 200.
+    """
+    try:
+        digest, size = await firmware_store.save(request.stream())
+    except ArtifactTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    use_primary(db)
+    existing = await db.scalar(select(FirmwareArtifact).where(FirmwareArtifact.sha256 == digest))
+    if existing is not None:
+        response.status_code = status.HTTP_200_OK
+        return existing
+    artifact = FirmwareArtifact(sha256=digest, size=size, version=version, filename=filename, uploaded_by=user.id)
+    db.add(artifact)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent upload of the same image committed first
+        await db.rollback()
+        response.status_code = status.HTTP_200_OK
+        return await db.scalar(select(FirmwareArtifact).where(FirmwareArtifact.sha256 == digest))
+    return artifact
+
+@router.get("", response_model=List[FirmwareArtifactOut])
+async def list_firmware(
+    version: Optional[str] = None,
+    user=Depends(require_permission("firmware_update", "view")),
+    db: AsyncSession = Depends(get_db),
+):
+    query = select(FirmwareArtifact).order_by(FirmwareArtifact.id.desc())
+    if version is not None:
+        query = query.where(FirmwareArtifact.version == version)
+    return (await db.scalars(query)).all()
+
+@router.get("/{sha256}", response_class=ZeroCopyFileResponse)
+async def download_firmware(request: Request, sha256: str, user=Depends(require_permission("ota_update", "view"))):
+    """Serve an image by digest, with Range support for resumed downloads.
+
+    The permission check runs off the token, user and permission-matrix caches
+    and the image is located on disk by its address, so a steady-state
+    download never touches the database. Images are immutable, so the digest
+    doubles as a strong ETag.
+    """
+    located = firmware_store.locate(sha256)
+    if located is None:
+        raise HTTPException(status_code=404, detail="Firmware not found")
+    path, size = located
+    etag = f'"{sha256}"'
+    headers = {"Cache-Control": "private, max-age=31536000, immutable"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**headers, "ETag": etag})
+    return ZeroCopyFileResponse(str(path), size, headers=headers, etag=etag)
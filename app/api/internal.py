@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import require_permission
+from app.db.pool import pool_stats
+from app.db.session import init_engines, replica_engines
+
+# Operational endpoints expose deployment internals; only roles that may read
+# configuration parameters can see them.
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(require_permission("config_params", "read_param"))],
+)
+
+@router.get("/db/pool")
+async def get_pool_stats():
+    engine, async_engine = init_engines()
+    return {
+        "sync": pool_stats(engine.pool),
+        "async": pool_stats(async_engine.sync_engine.pool),
+        "replicas": [pool_stats(replica.sync_engine.pool) for replica in replica_engines()],
+    }
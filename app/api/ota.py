@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import require_permission
+from app.core.config import settings
+from app.db.routing import use_primary
+from app.db.session import get_db
+from app.models.firmware import FirmwareArtifact
+from app.schemas.ota import OtaAssignment, OtaReport, RolloutCreate, RolloutStatus
+from app.services.ota_rollout import RolloutError, rollout_scheduler
+
+router = APIRouter(prefix="/ota", tags=["ota"])
+
+@router.post("/rollouts", status_code=status.HTTP_201_CREATED, response_model=RolloutStatus)
+async def create_rollout(
+    body: RolloutCreate,
+    user=Depends(require_permission("ota_update", "update")),
+    db: AsyncSession = Depends(get_db),
+):
+    # Rollouts usually follow an upload closely; a lagging replica would not have the row yet
+    use_primary(db)
+    artifact = await db.scalar(select(FirmwareArtifact).where(FirmwareArtifact.sha256 == body.sha256))
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Firmware not found")
+    try:
+        rollout_id = await rollout_scheduler.create(artifact.sha256, artifact.version, artifact.size, body.device_ids, body.waves)
+    except RolloutError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    return await rollout_scheduler.status(rollout_id)
+
+@router.get("/rollouts/{rollout_id}", response_model=RolloutStatus)
+async def get_rollout(rollout_id: int, user=Depends(require_permission("ota_update", "view"))):
+    try:
+        return await rollout_scheduler.status(rollout_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Rollout not found")
+
+@router.post("/rollouts/{rollout_id}/resume", response_model=RolloutStatus)
+async def resume_rollout(rollout_id: int, user=Depends(require_permission("ota_update", "update"))):
+    """Release the next wave of a rollout paused for too many failures."""
+    try:
+        await rollout_scheduler.resume(rollout_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Rollout not found")
+    except RolloutError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    return await rollout_scheduler.status(rollout_id)
+
+@router.delete("/rollouts/{rollout_id}", response_model=RolloutStatus)
+async def cancel_rollout(rollout_id: int, user=Depends(require_permission("ota_update", "delete"))):
+    try:
+        await rollout_scheduler.cancel(rollout_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Rollout not found")
+    return await rollout_scheduler.status(rollout_id)
+
+@router.get(
+    "/devices/{device_id}/assignment",
+    response_model=OtaAssignment,
+    responses={204: {"description": "No update for this device yet"}},
+)
+async def poll_assignment(
+    device_id: str,
+    wait: float = Query(0, ge=0, le=settings.OTA_POLL_TIMEOUT),
+    user=Depends(require_permission("ota_update", "view")),
+):
+    """Long-poll for an update: returns as soon as the device is granted one, or 204 after ``wait`` seconds.
+
+    Served from this worker's cache of current leases, which picks up grants
+    made by other workers within ``OTA_TICK_INTERVAL``; a 200 is a lease to
+    download the image now, and the device should report the outcome.
+    """
+    assignment = await rollout_scheduler.wait_for(device_id, wait)
+    if assignment is None:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return {
+        "rollout_id": assignment.rollout_id,
+        "sha256": assignment.sha256,
+        "version": assignment.version,
+        "size": assignment.size,
+        "download_url": f"/firmware/{assignment.sha256}",
+        "lease_expires_in": max(0.0, assignment.expires_at - rollout_scheduler.clock()),
+    }
+
+@router.post("/devices/{device_id}/report", status_code=status.HTTP_204_NO_CONTENT)
+async def report_outcome(device_id: str, body: OtaReport, user=Depends(require_permission("ota_update", "update"))):
+    try:
+        await rollout_scheduler.report(device_id, body.status == "completed")
+    except KeyError:
+        raise HTTPException(status_code=404, detail="No active OTA assignment for this device")
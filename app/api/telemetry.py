@@ -0,0 +1,71 @@
+import math
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import require_permission
+from app.core.config import settings
+from app.db.session import get_db
+from app.schemas.telemetry import TelemetryAccepted, TelemetryBatch
+from app.services.telemetry_frame import CONTENT_TYPE, FrameError, decode_frame, frame_readings
+from app.services.telemetry_ingest import telemetry_ingestor
+from app.services.telemetry_query import downsampled_series
+
+router = APIRouter(prefix="/telemetry", tags=["telemetry"])
+
+@router.post("/readings", status_code=status.HTTP_202_ACCEPTED, response_model=TelemetryAccepted)
+async def ingest_readings(batch: TelemetryBatch, user=Depends(require_permission("telemetry_data", "update"))):
+    """Queue a batch of readings; they are written in bulk within TELEMETRY_FLUSH_INTERVAL seconds."""
+    readings = [(reading.device_id, reading.metric, reading.ts_ms, reading.value) for reading in batch.readings]
+    return _submit(readings)
+
+@router.post(
+    "/frames",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=TelemetryAccepted,
+    openapi_extra={"requestBody": {"required": True, "content": {CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}}}}},
+)
+async def ingest_frame(request: Request, user=Depends(require_permission("lte_telemetry", "update"))):
+    """Queue the readings of one binary frame (see ``app.services.telemetry_frame`` for the layout)."""
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.TELEMETRY_MAX_FRAME_BYTES:
+            raise HTTPException(status_code=413, detail="Frame too large")
+    try:
+        frame = decode_frame(body)
+    except FrameError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return _submit(frame_readings(frame))
+
+def _submit(readings) -> dict:
+    if not telemetry_ingestor.submit(readings):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Telemetry buffer is full, retry shortly",
+            headers={"Retry-After": str(max(1, math.ceil(telemetry_ingestor.flush_interval)))},
+        )
+    return {"accepted": len(readings)}
+
+@router.get("/devices/{device_id}/series")
+async def get_series(
+    device_id: str,
+    metric: str,
+    start_ms: int,
+    end_ms: int,
+    points: int = Query(500, ge=3, le=settings.TELEMETRY_SERIES_MAX_POINTS),
+    method: Literal["minmax", "lttb"] = "minmax",
+    user=Depends(require_permission("telemetry_data", "view")),
+    db: AsyncSession = Depends(get_db),
+):
+    """One metric of one device over ``[start_ms, end_ms)``, reduced to about ``points`` points.
+
+    ``minmax`` returns parallel ``ts_ms``/``min``/``max``/``mean``/``last``/``count``
+    arrays, one entry per non-empty time bucket. ``lttb`` returns ``ts_ms``/``value``
+    arrays of raw readings picked by Largest-Triangle-Three-Buckets.
+    """
+    if end_ms <= start_ms:
+        raise HTTPException(status_code=400, detail="end_ms must be after start_ms")
+    body = await downsampled_series(db, device_id, metric, start_ms, end_ms, points, method)
+    return Response(content=body, media_type="application/json")
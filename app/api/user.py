@@ -1,181 +1,167 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
-from app.schemas.user import UserCreate, UserRead, UserLogin, UserRole, TokenResponse, LoginResponse, ErrorResponse
-from app.services.user_service import UserService
-from app.models.user import Role, Module, Resource, Permission, RoleResourcePermission, User
-from jose import jwt, JWTError
-from passlib.context import CryptContext
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from typing import List, Optional
-import os
-from datetime import datetime, timedelta
-import secrets
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.responses import BodyStreamingResponse, FastJSONResponse
+from fastapi.responses import StreamingResponse
+from app.db.routing import read_your_writes, remember_write, use_primary
+from app.db.session import AsyncSessionLocal, get_db
+from app.schemas.user import UserCreate, UserRead, UserLogin, UserPage, UserRole, LoginResponse, ErrorResponse
+from app.services.user_service import UserService, decode_cursor
+from app.services.rbac_service import RBACService
+from app.services import permission_matrix
+from app.services.catalog_cache import catalog_cache, etag_matches
+from app.core.hashing import HasherSaturated, password_hasher
+from app.core.rate_limit import get_login_limiter
+from app.models.user import Role, Module, Resource, Permission, User
+from app.core.security import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_SECRET_KEY,
+    create_access_token,
+    create_refresh_token,
+    verify_token,
+)
+from app.api.deps import get_cached_user, get_current_user, invalidate_user, require_permission
+from app.services.token_revocation import revocation_store
+from app.services.user_import import UserImporter, iter_lines, iter_records
+from typing import List, Literal, Optional
+import json
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key-change-in-production")
-REFRESH_SECRET_KEY = os.environ.get("REFRESH_SECRET_KEY", "your-refresh-secret-key-change-in-production")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
-REFRESH_TOKEN_EXPIRE_DAYS = 7
+async def verify_password(plain_password, hashed_password):
+    return await password_hasher.verify(plain_password, hashed_password)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
+async def get_password_hash(password):
+    return await password_hasher.hash(password)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    read_your_writes(db, f"username:{username}")
+    user = await UserService.get_user_by_username(db, username)
     if not user or not user.hashed_password:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         return None
     return user
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
-
-def create_refresh_token(data: dict):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
-
-def verify_token(token: str, secret_key: str = SECRET_KEY):
-    try:
-        payload = jwt.decode(token, secret_key, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+def user_payload(user: User) -> dict:
+    """UserRead-shaped dict read straight off the ORM row; trusted, so not re-validated."""
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "full_name": user.full_name,
+        "role_id": user.role_id,
+        "is_active": user.is_active,
+        "created_at": getattr(user, "created_at", None),
+        "updated_at": getattr(user, "updated_at", None),
+    }
+
+def token_payload(user: User, access_token: str, refresh_token: str) -> dict:
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "user": user_payload(user),
+    }
+
+def login_response(success: bool, message: str, data: Optional[dict] = None) -> FastJSONResponse:
+    # Returning a Response skips FastAPI's response_model pass; LoginResponse still documents the shape
+    return FastJSONResponse({"success": success, "message": message, "data": data})
 
 @router.post("/login", response_model=LoginResponse)
-def login(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login(login_data: UserLogin, request: Request, db: AsyncSession = Depends(get_db)):
+    # Raises RateLimited (429) before any DB or bcrypt work
+    get_login_limiter().check(login_data.username, request.client.host if request.client else None)
     try:
-        user = authenticate_user(db, login_data.username, login_data.password)
+        user = await authenticate_user(db, login_data.username, login_data.password)
         if not user:
-            return LoginResponse(
-                success=False,
-                message="Invalid username or password"
-            )
+            return login_response(False, "Invalid username or password")
         
         if not user.is_active:
-            return LoginResponse(
-                success=False,
-                message="Account is deactivated. Please contact support."
-            )
+            return login_response(False, "Account is deactivated. Please contact support.")
         
         # Create tokens
         access_token = create_access_token({"sub": user.username, "user_id": user.id, "role_id": user.role_id})
         refresh_token = create_refresh_token({"sub": user.username, "user_id": user.id})
         
-        # Get user role
-        role = db.query(Role).filter(Role.id == user.role_id).first() if user.role_id else None
-        
-        token_response = TokenResponse(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-            user=UserRead(
-                id=user.id,
-                username=user.username,
-                email=user.email,
-                full_name=user.full_name,
-                role_id=user.role_id,
-                is_active=user.is_active,
-                created_at=user.created_at if hasattr(user, 'created_at') else None,
-                updated_at=user.updated_at if hasattr(user, 'updated_at') else None
-            )
-        )
+        token_response = token_payload(user, access_token, refresh_token)
         
-        return LoginResponse(
-            success=True,
-            message="Login successful",
-            data=token_response
-        )
+        return login_response(True, "Login successful", token_response)
         
+    except HasherSaturated:
+        raise
     except Exception as e:
-        return LoginResponse(
-            success=False,
-            message="An error occurred during login. Please try again."
-        )
+        return login_response(False, "An error occurred during login. Please try again.")
 
 @router.post("/refresh", response_model=LoginResponse)
-def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
+async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
     try:
         payload = verify_token(refresh_token, REFRESH_SECRET_KEY)
         if not payload or payload.get("type") != "refresh":
-            return LoginResponse(
-                success=False,
-                message="Invalid refresh token"
-            )
+            return login_response(False, "Invalid refresh token")
+        
+        jti = payload.get("jti")
+        user_id = payload.get("user_id")
+        if not jti or user_id is None:
+            return login_response(False, "Invalid refresh token")
         
-        username = payload.get("sub")
-        user = db.query(User).filter(User.username == username).first()
+        user = await get_cached_user(db, user_id)
         
         if not user or not user.is_active:
-            return LoginResponse(
-                success=False,
-                message="User not found or inactive"
-            )
+            return login_response(False, "User not found or inactive")
+        
+        # Rotate: each refresh token can be exchanged exactly once
+        if not await revocation_store.revoke(db, jti, payload["exp"]):
+            return login_response(False, "Refresh token has been revoked")
         
         # Create new tokens
         access_token = create_access_token({"sub": user.username, "user_id": user.id, "role_id": user.role_id})
         new_refresh_token = create_refresh_token({"sub": user.username, "user_id": user.id})
         
-        token_response = TokenResponse(
-            access_token=access_token,
-            refresh_token=new_refresh_token,
-            expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-            user=UserRead(
-                id=user.id,
-                username=user.username,
-                email=user.email,
-                full_name=user.full_name,
-                role_id=user.role_id,
-                is_active=user.is_active,
-                created_at=user.created_at if hasattr(user, 'created_at') else None,
-                updated_at=user.updated_at if hasattr(user, 'updated_at') else None
-            )
-        )
+        token_response = token_payload(user, access_token, new_refresh_token)
         
-        return LoginResponse(
-            success=True,
-            message="Token refreshed successfully",
-            data=token_response
-        )
+        return login_response(True, "Token refreshed successfully", token_response)
         
     except Exception as e:
-        return LoginResponse(
-            success=False,
-            message="Failed to refresh token"
-        )
+        return login_response(False, "Failed to refresh token")
+
+@router.get("/", response_model=UserPage)
+async def list_users(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    role_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_db),
+):
+    """List users by ascending id using keyset pagination.
+
+    ``format=ndjson`` streams every matching user (from ``cursor`` onwards)
+    instead of a single page.
+    """
+    try:
+        after_id = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if format == "ndjson":
+        async def export():
+            async with AsyncSessionLocal() as export_db:
+                async for row in UserService.stream_users(export_db, after_id, role_id, is_active, settings.USER_EXPORT_BATCH_SIZE):
+                    yield json.dumps(row) + "\n"
+        return StreamingResponse(export(), media_type="application/x-ndjson")
+
+    items, next_cursor = await UserService.list_users(db, limit, after_id, role_id, is_active)
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.post("/", response_model=UserRead)
-def create_user(user_in: UserCreate, db: Session = Depends(get_db)):
-    user = UserService.get_user_by_email(db, user_in.email)
+async def create_user(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
+    user = await UserService.get_user_by_email(db, user_in.email)
     if user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await get_password_hash(user_in.password)
     user_in_data = user_in.model_dump()
     user_in_data["hashed_password"] = hashed_password
     user_obj = User(
@@ -187,49 +173,107 @@ def create_user(user_in: UserCreate, db: Session = Depends(get_db)):
         role_id=user_in_data.get("role_id")
     )
     db.add(user_obj)
-    db.commit()
-    db.refresh(user_obj)
-    return user_obj
+    await db.commit()
+    await db.refresh(user_obj)
+    remember_write(f"user:{user_obj.id}", f"username:{user_obj.username}")
+    return FastJSONResponse(user_payload(user_obj))
+
+@router.post("/bulk")
+async def bulk_create_users(request: Request, user=Depends(require_permission("user_management", "register"))):
+    """Import users from NDJSON (default) or CSV (``Content-Type: text/csv``).
+
+    The body is parsed as it arrives and one NDJSON result line is streamed
+    back per input row, tagged with its row number; rejected rows are
+    reported straight away, so lines are not in input order.
+    """
+    fmt = "csv" if request.headers.get("content-type", "").startswith("text/csv") else "ndjson"
+
+    async def results():
+        async with AsyncSessionLocal() as db:
+            importer = UserImporter(db, settings.BULK_IMPORT_CHUNK_SIZE, settings.BULK_IMPORT_HASH_WORKERS)
+            records = iter_records(iter_lines(request.stream()), fmt)
+            async for result in importer.run(records):
+                yield json.dumps(result) + "\n"
+
+    return BodyStreamingResponse(results(), media_type="application/x-ndjson")
+
+@router.get("/me", response_model=UserRead)
+async def read_current_user(current_user: User = Depends(get_current_user)):
+    return FastJSONResponse(user_payload(current_user))
 
 @router.get("/{user_id}", response_model=UserRead)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = UserService.get_user_by_id(db, user_id)
+async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
+    read_your_writes(db, f"user:{user_id}")
+    user = await UserService.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return FastJSONResponse(user_payload(user))
 
 # RBAC Endpoints
+async def catalog_response(request: Request, db: AsyncSession, name: str, loader) -> Response:
+    """Serve a catalog from memory, answering a matching If-None-Match with 304."""
+    async def build():
+        # Rebuilds follow catalog writes; a lagging replica would cache stale rows
+        use_primary(db)
+        return await loader()
+    entry = await catalog_cache.get_or_build(name, build)
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+def _rows(result) -> List[dict]:
+    return [dict(row._mapping) for row in result.all()]
+
 @router.get("/roles/", response_model=List[UserRole])
-def list_roles(db: Session = Depends(get_db)):
-    roles = db.query(Role).all()
-    return [UserRole(role_id=r.id, role_name=r.name) for r in roles]
+async def list_roles(request: Request, db: AsyncSession = Depends(get_db)):
+    async def load():
+        result = await db.execute(select(Role.id.label("role_id"), Role.name.label("role_name")).order_by(Role.id))
+        return _rows(result)
+    return await catalog_response(request, db, "roles", load)
 
 @router.get("/modules/")
-def list_modules(db: Session = Depends(get_db)):
-    return db.query(Module).all()
+async def list_modules(request: Request, db: AsyncSession = Depends(get_db)):
+    async def load():
+        return _rows(await db.execute(select(Module.id, Module.name, Module.description).order_by(Module.id)))
+    return await catalog_response(request, db, "modules", load)
 
 @router.get("/resources/")
-def list_resources(db: Session = Depends(get_db)):
-    return db.query(Resource).all()
+async def list_resources(request: Request, db: AsyncSession = Depends(get_db)):
+    async def load():
+        return _rows(await db.execute(
+            select(Resource.id, Resource.name, Resource.description, Resource.module_id).order_by(Resource.id)
+        ))
+    return await catalog_response(request, db, "resources", load)
 
 @router.get("/permissions/")
-def list_permissions(db: Session = Depends(get_db)):
-    return db.query(Permission).all()
+async def list_permissions(request: Request, db: AsyncSession = Depends(get_db)):
+    async def load():
+        return _rows(await db.execute(select(Permission.id, Permission.name, Permission.description).order_by(Permission.id)))
+    return await catalog_response(request, db, "permissions", load)
+
+@router.get("/roles/permissions/")
+async def get_roles_permissions(role_ids: List[int] = Query(...), db: AsyncSession = Depends(get_db)):
+    return await RBACService.get_permissions_for_roles(db, role_ids)
 
 @router.get("/role/{role_id}/permissions/")
-def get_role_permissions(role_id: int, db: Session = Depends(get_db)):
-    perms = db.query(RoleResourcePermission).filter(RoleResourcePermission.role_id == role_id).all()
-    return [{
-        "resource": db.query(Resource).get(p.resource_id).name,
-        "permission": db.query(Permission).get(p.permission_id).name
-    } for p in perms]
+async def get_role_permissions(role_id: int, db: AsyncSession = Depends(get_db)):
+    return await RBACService.get_role_permissions(db, role_id)
+
+@router.get("/role/{role_id}/can/{resource}/{permission}")
+async def check_role_permission(role_id: int, resource: str, permission: str, db: AsyncSession = Depends(get_db)):
+    allowed = await permission_matrix.has_permission(db, role_id, resource, permission)
+    return {"role_id": role_id, "resource": resource, "permission": permission, "allowed": allowed}
 
 @router.post("/assign-role/{user_id}/{role_id}")
-def assign_role(user_id: int, role_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).get(user_id)
-    role = db.query(Role).get(role_id)
+async def assign_role(user_id: int, role_id: int, db: AsyncSession = Depends(get_db)):
+    user = await db.get(User, user_id)
+    role = await db.get(Role, role_id)
     if not user or not role:
         raise HTTPException(status_code=404, detail="User or Role not found")
     user.role_id = role_id
-    db.commit()
+    await db.commit()
+    permission_matrix.bump_version()
+    invalidate_user(user_id)
+    remember_write(f"user:{user_id}")
     return {"message": f"Role '{role.name}' assigned to user '{user.username}'"} 
\ No newline at end of file
@@ -1,8 +1,28 @@
 from pydantic_settings import BaseSettings
+from typing import List, Optional
 import os
 
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def to_async_url(database_url: str) -> str:
+    """Swap a sync database URL's driver for its async counterpart."""
+    scheme, sep, rest = database_url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database URL scheme '{scheme}'")
+    return f"{ASYNC_DRIVERS[dialect]}{sep}{rest}"
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "FastAPI Backend"
+    DEBUG: bool = False
+
+    # Query instrumentation
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    N_PLUS_ONE_THRESHOLD: int = 5
     
     # Database configuration
     DATABASE_URL: str = "sqlite:///./app.db"
@@ -14,6 +34,94 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "fastapi_user"
     POSTGRES_PASSWORD: str = "fastapi_password"
     USE_POSTGRES: bool = False
+
+    # Async driver URL for the API; derived from the sync URL when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Read replicas for the API (comma-separated sync or async URLs); empty sends all reads to the primary
+    DATABASE_REPLICA_URLS: str = ""
+    # Seconds a replica that failed to connect is skipped
+    REPLICA_COOLDOWN: float = 30.0
+    # Seconds reads of a just-written user stay on the primary
+    READ_YOUR_WRITES_WINDOW: float = 5.0
+
+    # Bearer token required to scrape /metrics; leave unset to allow unauthenticated scrapes
+    METRICS_TOKEN: Optional[str] = None
+
+    # Connection pool (PostgreSQL)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_TIMEOUT: float = 30.0
+
+    # SQLite connection pragmas
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+
+    # Password hashing (bcrypt runs in a process pool; 0 workers hashes in a thread)
+    PASSWORD_HASH_WORKERS: int = os.cpu_count() or 1
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_START_METHOD: str = "forkserver"
+
+    # Bulk user import
+    BULK_IMPORT_CHUNK_SIZE: int = 500
+    # Hashing workers one import may occupy; the rest stay free for logins
+    BULK_IMPORT_HASH_WORKERS: int = max(1, (os.cpu_count() or 1) // 2)
+
+    # Rows fetched per server-side cursor batch in NDJSON user exports
+    USER_EXPORT_BATCH_SIZE: int = 1000
+
+    # Authentication caches
+    TOKEN_CACHE_SIZE: int = 10000
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: float = 30.0
+    # Seconds between checks for RBAC changes committed by other processes
+    CACHE_VERSION_POLL_INTERVAL: float = 2.0
+
+    # Login rate limiting (sliding window); "shared" keeps counters in shared memory for all workers on a host
+    LOGIN_RATE_LIMIT_PER_USERNAME: int = 10
+    LOGIN_RATE_LIMIT_PER_IP: int = 100
+    LOGIN_RATE_LIMIT_WINDOW: float = 60.0
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    RATE_LIMIT_SHM_NAME: str = "fastapi-login-limits"
+
+    # Telemetry ingestion: readings are buffered in memory and bulk-inserted
+    TELEMETRY_BUFFER_CAPACITY: int = 200_000
+    TELEMETRY_FLUSH_ROWS: int = 5000
+    TELEMETRY_FLUSH_INTERVAL: float = 1.0
+    TELEMETRY_MAX_FRAME_BYTES: int = 1024 * 1024
+    TELEMETRY_FRAME_MAX_READINGS: int = 10000
+    # Downsampled series queries
+    TELEMETRY_QUERY_CHUNK_SIZE: int = 10000
+    TELEMETRY_SERIES_MAX_POINTS: int = 5000
+    TELEMETRY_SERIES_CACHE_SIZE: int = 512
+    TELEMETRY_SERIES_CACHE_TTL: float = 300.0
+    TELEMETRY_SERIES_RECENT_TTL: float = 5.0
+
+    # Content-addressed firmware artifact store
+    FIRMWARE_STORAGE_DIR: str = "./firmware_store"
+    FIRMWARE_MAX_BYTES: int = 512 * 1024 * 1024
+    FIRMWARE_WRITE_BUFFER: int = 1024 * 1024
+
+    # Staged OTA rollouts
+    OTA_MAX_ACTIVE_DOWNLOADS: int = 200
+    OTA_EGRESS_BYTES_PER_SEC: float = 100 * 1024 * 1024
+    OTA_LEASE_SECONDS: float = 900.0
+    OTA_MAX_ATTEMPTS: int = 3
+    OTA_MAX_FAILURE_RATIO: float = 0.05
+    OTA_TICK_INTERVAL: float = 1.0
+    OTA_POLL_TIMEOUT: float = 30.0
+
+    # Cleaning-log group commit
+    CLEANING_LOG_COMMIT_WINDOW: float = 0.005
+    CLEANING_LOG_MAX_BATCH: int = 500
+
+    # Refresh-token revocation store
+    REVOCATION_BLOOM_BITS: int = 8 * 1024 * 1024
+    REVOCATION_BLOOM_HASHES: int = 7
+    REVOCATION_PRUNE_INTERVAL: float = 300.0
     
     @property
     def get_database_url(self) -> str:
@@ -27,6 +135,20 @@ class Settings(BaseSettings):
         
         return self.DATABASE_URL
 
+    @property
+    def get_async_database_url(self) -> str:
+        """Get the async driver URL (aiosqlite for SQLite, asyncpg for PostgreSQL)"""
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+
+        return to_async_url(self.get_database_url)
+
+    @property
+    def get_async_replica_urls(self) -> List[str]:
+        """Async driver URLs of the configured read replicas"""
+        urls = [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+        return [url if "+" in url.partition("://")[0] else to_async_url(url) for url in urls]
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,109 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.metrics import record_bcrypt_time
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Build the bcrypt context on first use; passlib is only imported then."""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class HasherSaturated(Exception):
+    """Raised instead of queueing when too many hash operations are already pending."""
+
+
+def _warm_up() -> None:
+    get_pwd_context()
+
+
+def _hash(password: str) -> str:
+    return get_pwd_context().hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return get_pwd_context().verify(password, hashed_password)
+
+
+def _hash_batch(passwords: List[str]) -> List[str]:
+    return [get_pwd_context().hash(password) for password in passwords]
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop in a bounded process pool.
+
+    The pool is created by ``start()`` from the app lifespan, using an explicit
+    multiprocessing start method so workers are never forked from a process
+    that already runs driver threads. Until then, or with ``workers=0``,
+    hashing runs in the default thread executor.
+    """
+
+    def __init__(self, workers: int, max_pending: int, start_method: str = "forkserver"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.start_method = start_method
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def start(self):
+        """Create the worker pool and wait until every worker has started."""
+        if not self.workers or self._executor is not None:
+            return
+        if self.start_method in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context(self.start_method)
+        else:
+            context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _warm_up) for _ in range(self.workers)))
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise HasherSaturated(f"{self.pending} password hash operations already pending")
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+            record_bcrypt_time(time.perf_counter() - start)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(_verify, password, hashed_password)
+
+    async def hash_many(self, passwords: List[str], max_jobs: Optional[int] = None) -> List[str]:
+        """Hash a batch split into one job per worker, occupying at most that many queue slots.
+
+        ``max_jobs`` caps the jobs, and so the workers, the batch may occupy at once.
+        """
+        if not passwords:
+            return []
+        parts = max(1, min(self.workers or 1, max_jobs or len(passwords), len(passwords)))
+        size = -(-len(passwords) // parts)
+        slices = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+        results = await asyncio.gather(*(self._submit(_hash_batch, part) for part in slices))
+        return [hashed for part in results for hashed in part]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    start_method=settings.PASSWORD_HASH_START_METHOD,
+)
@@ -0,0 +1,256 @@
+import bisect
+import contextvars
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``observe`` does one bisect and two additions."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {"buckets": buckets, "count": self.count, "sum": self.sum}
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Gauge:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class MetricFamily:
+    """A named metric with one child per label-value tuple.
+
+    Children are created under a lock the first time a label combination is
+    seen; after that ``labels()`` is a plain dict lookup, and recording
+    touches only the child. Increments rely on the GIL rather than a lock,
+    which can at worst drop an update under thread contention.
+    """
+
+    def __init__(self, kind: str, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 factory: Callable[[], object] = None):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._factory()
+                    self._children[values] = child
+        return child
+
+    def collect(self) -> Iterable[Tuple[Tuple[str, ...], object]]:
+        return list(self._children.items())
+
+
+class CallbackGauge:
+    """Gauge whose value is computed at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = ()
+        self.callback = callback
+
+    def collect(self):
+        return [((), self.callback())]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self.register(MetricFamily("counter", name, documentation, labelnames, Counter))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self.register(MetricFamily("gauge", name, documentation, labelnames, Gauge))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> MetricFamily:
+        return self.register(MetricFamily("histogram", name, documentation, labelnames, lambda: Histogram(buckets)))
+
+    def callback_gauge(self, name: str, documentation: str, callback: Callable[[], float]) -> CallbackGauge:
+        return self.register(CallbackGauge(name, documentation, callback))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format (0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for values, child in metric.collect():
+                labels = _format_labels(metric.labelnames, values)
+                if metric.kind == "histogram":
+                    cumulative = 0
+                    for bound, count in zip((*child.buckets, float("inf")), child.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(float(bound))
+                        bucket_labels = _format_labels((*metric.labelnames, "le"), (*values, le))
+                        lines.append(f"{metric.name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(f"{metric.name}_sum{labels} {child.sum}")
+                    lines.append(f"{metric.name}_count{labels} {child.count}")
+                else:
+                    value = child if isinstance(child, (int, float)) else child.value
+                    lines.append(f"{metric.name}{labels} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class RequestStats:
+    """Per-request accumulators for time spent outside the handler's own code."""
+
+    __slots__ = ("db_seconds", "bcrypt_seconds")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.bcrypt_seconds = 0.0
+
+
+request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+
+def record_bcrypt_time(seconds: float):
+    stats = request_stats.get()
+    if stats is not None:
+        stats.bcrypt_seconds += seconds
+
+
+def record_db_time(seconds: float):
+    stats = request_stats.get()
+    if stats is not None:
+        stats.db_seconds += seconds
+
+
+def _threadpool_statistics():
+    try:
+        import anyio.to_thread
+        return anyio.to_thread.current_default_thread_limiter().statistics()
+    except RuntimeError:
+        # No running event loop (e.g. rendered from a plain thread)
+        return None
+
+
+def _threadpool_busy() -> float:
+    stats = _threadpool_statistics()
+    return stats.borrowed_tokens if stats else 0
+
+
+def _threadpool_waiting() -> float:
+    stats = _threadpool_statistics()
+    return stats.tasks_waiting if stats else 0
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+REQUESTS_TOTAL = registry.counter(
+    "http_requests_total", "HTTP responses by route template and status code.", ("method", "route", "status"))
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.")
+REQUEST_DB_TIME = registry.histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request.", ("method", "route"))
+REQUEST_BCRYPT_TIME = registry.histogram(
+    "http_request_bcrypt_seconds", "Time spent hashing or verifying passwords per request.", ("method", "route"))
+registry.callback_gauge(
+    "threadpool_busy_threads", "Worker threads currently running sync endpoints or blocking calls.", _threadpool_busy)
+registry.callback_gauge(
+    "threadpool_queue_depth", "Tasks waiting for a free worker thread.", _threadpool_waiting)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status codes and per-request DB/bcrypt time."""
+
+    def __init__(self, app):
+        self.app = app
+        self._in_flight = REQUESTS_IN_FLIGHT.labels()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = self._in_flight
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            request_stats.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "<unmatched>"
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, template).observe(elapsed)
+            REQUESTS_TOTAL.labels(method, template, str(status_code)).inc()
+            REQUEST_DB_TIME.labels(method, template).observe(stats.db_seconds)
+            REQUEST_BCRYPT_TIME.labels(method, template).observe(stats.bcrypt_seconds)
@@ -0,0 +1,178 @@
+import hashlib
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
+from app.core.config import settings
+
+# (window index, hits in that window, hits in the window before it)
+State = Tuple[int, int, int]
+
+
+class RateLimited(Exception):
+    """Raised before doing any work for a caller that is over its limit."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited; retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def sliding_window(state: Optional[State], limit: int, window: float, now: float) -> Tuple[State, float]:
+    """Count one hit against a sliding-window limit.
+
+    The window is approximated from two fixed windows: hits in the previous
+    window are weighted by how much of it still overlaps the sliding window.
+    Returns the new state and 0.0 when the hit is allowed, or the unchanged
+    state and the seconds until a hit would be allowed.
+    """
+    index = int(now // window)
+    elapsed = now - index * window
+    if state is None or state[0] < index - 1:
+        current, previous = 0, 0
+    elif state[0] == index - 1:
+        current, previous = 0, state[1]
+    else:
+        current, previous = state[1], state[2]
+
+    if previous * (1 - elapsed / window) + current < limit:
+        return (index, current + 1, previous), 0.0
+
+    if current < limit:
+        # The previous window's share decays enough before this window ends
+        wait = window * (1 - (limit - current) / previous) - elapsed
+    else:
+        wait = (window - elapsed) + window * (1 - limit / current)
+    return (index, current, previous), max(1.0, math.ceil(wait))
+
+
+class MemoryBackend:
+    """Per-process counters in an LRU bounded to ``max_keys`` entries."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._states: "OrderedDict[str, State]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> float:
+        with self._lock:
+            state, retry_after = sliding_window(self._states.get(key), limit, window, now)
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_keys:
+                self._states.popitem(last=False)
+            return retry_after
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+class SharedMemoryBackend:
+    """Counters in a named shared-memory hash table, shared by every worker on the host.
+
+    Each slot holds an 8-byte key digest and the window state; a key probes
+    ``probes`` consecutive slots and, when all hold other keys, takes over
+    the one with the oldest window. Updates are serialized with ``flock`` on
+    a lock file next to the segment. The segment outlives the workers; call
+    ``close(unlink=True)`` from a deploy script to remove it.
+    """
+
+    SLOT = struct.Struct("<QqII")
+
+    def __init__(self, name: str, slots: int, probes: int = 8):
+        from multiprocessing import shared_memory
+
+        self.slots = slots
+        self.probes = min(probes, slots)
+        size = slots * self.SLOT.size
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=name)
+        # Python < 3.13 registers attached segments for unlinking when this process exits
+        try:
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        except Exception:
+            pass
+        self._lock_fd = os.open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), os.O_CREAT | os.O_RDWR, 0o600)
+        self._thread_lock = threading.Lock()
+
+    def _digest(self, key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> float:
+        import fcntl
+
+        digest = self._digest(key)
+        buf = self._shm.buf
+        start = digest % self.slots
+        with self._thread_lock:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                target, state, oldest = None, None, None
+                for probe in range(self.probes):
+                    offset = ((start + probe) % self.slots) * self.SLOT.size
+                    slot_digest, index, current, previous = self.SLOT.unpack_from(buf, offset)
+                    if slot_digest == digest:
+                        target, state = offset, (index, current, previous)
+                        break
+                    if slot_digest == 0:
+                        target = offset
+                        break
+                    if oldest is None or index < oldest[1]:
+                        oldest = (offset, index)
+                if target is None:
+                    target = oldest[0]
+                state, retry_after = sliding_window(state, limit, window, now)
+                self.SLOT.pack_into(buf, target, digest, *state)
+                return retry_after
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def close(self, unlink: bool = False):
+        self._shm.close()
+        os.close(self._lock_fd)
+        if unlink:
+            self._shm.unlink()
+
+
+class LoginRateLimiter:
+    """Limits login attempts per username and per client IP."""
+
+    def __init__(self, backend, per_username: int, per_ip: int, window: float, clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.per_username = per_username
+        self.per_ip = per_ip
+        self.window = window
+        self.clock = clock
+
+    def check(self, username: str, client_ip: Optional[str]):
+        """Count one attempt; raises RateLimited if either key is over its limit."""
+        now = self.clock()
+        retry_after = self.backend.hit(f"user:{username.strip().lower()}", self.per_username, self.window, now)
+        if client_ip:
+            retry_after = max(retry_after, self.backend.hit(f"ip:{client_ip}", self.per_ip, self.window, now))
+        if retry_after:
+            raise RateLimited(retry_after)
+
+
+@lru_cache(maxsize=None)
+def get_login_limiter() -> LoginRateLimiter:
+    """Build the configured limiter on first use, so importing never maps shared memory."""
+    if settings.RATE_LIMIT_BACKEND == "shared":
+        backend = SharedMemoryBackend(settings.RATE_LIMIT_SHM_NAME, settings.RATE_LIMIT_MAX_KEYS)
+    else:
+        backend = MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+    return LoginRateLimiter(
+        backend,
+        per_username=settings.LOGIN_RATE_LIMIT_PER_USERNAME,
+        per_ip=settings.LOGIN_RATE_LIMIT_PER_IP,
+        window=settings.LOGIN_RATE_LIMIT_WINDOW,
+    )
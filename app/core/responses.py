@@ -0,0 +1,142 @@
+import mmap
+import os
+import re
+from typing import Any, Mapping, Optional, Tuple
+
+import anyio
+import orjson
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson.
+
+    The app uses it as the default response class; routes can still pick
+    another class with ``response_class=``. Non-string dict keys (such as
+    role ids) are stringified the same way the stdlib encoder does it.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """StreamingResponse for generators that are still reading the request body.
+
+    ``StreamingResponse`` normally runs a disconnect listener that consumes
+    ``receive`` alongside the body iterator, which would steal the request
+    body chunks. This variant leaves ``receive`` to the handler.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+class ZeroCopyFileResponse(Response):
+    """Serves a file, or one byte range of it, handing the copy to the server when it can.
+
+    Servers that advertise the ASGI ``http.response.zerocopy`` extension get the
+    open file with an offset and count and send it with ``sendfile(2)``; whole
+    files otherwise go out through ``http.response.pathsend`` when available.
+    Plain uvicorn offers neither, and there every chunk is copied: it is
+    sliced from an mmap of the file into a ``chunk_size`` ``bytes`` object, as
+    ``FileResponse`` would read it, so memory per download stays at one chunk
+    but the bytes do pass through Python. Only single ranges are honoured; a
+    multi-range request gets the whole file, which RFC 9110 allows.
+    """
+
+    chunk_size = 1024 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        media_type: str = "application/octet-stream",
+        headers: Optional[Mapping[str, str]] = None,
+        etag: Optional[str] = None,
+    ):
+        self.path = path
+        self.size = size
+        self.media_type = media_type
+        self.etag = etag
+        self.background = None
+        self.status_code = 200
+        self.body = b""
+        self.init_headers(headers)
+        self.headers["accept-ranges"] = "bytes"
+        if etag is not None:
+            self.headers["etag"] = etag
+
+    def byte_range(self, request_headers: Headers) -> Optional[Tuple[int, int]]:
+        """The ``[start, end)`` slice requested, ``None`` for the whole file.
+
+        Raises ``ValueError`` when the range cannot be satisfied.
+        """
+        header = request_headers.get("range")
+        if header is None:
+            return None
+        if_range = request_headers.get("if-range")
+        if if_range is not None and if_range != self.etag:
+            return None
+        match = _RANGE.match(header.strip())
+        if match is None:
+            return None
+        first, last = match.groups()
+        if not first:
+            if not last or int(last) == 0:
+                raise ValueError(header)
+            return max(0, self.size - int(last)), self.size
+        start = int(first)
+        end = min(int(last) + 1, self.size) if last else self.size
+        if start >= self.size or start >= end:
+            raise ValueError(header)
+        return start, end
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        try:
+            requested = self.byte_range(request_headers)
+        except ValueError:
+            self.status_code = 416
+            self.headers["content-range"] = f"bytes */{self.size}"
+            self.headers["content-length"] = "0"
+            await send({"type": "http.response.start", "status": 416, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        start, end = requested or (0, self.size)
+        if requested is not None:
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {start}-{end - 1}/{self.size}"
+        self.headers["content-length"] = str(end - start)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        extensions = scope.get("extensions") or {}
+        if scope["method"].upper() == "HEAD" or end == start:
+            await send({"type": "http.response.body", "body": b""})
+        elif "http.response.zerocopy" in extensions:
+            with open(self.path, "rb") as file:
+                await send({"type": "http.response.zerocopy", "file": file.fileno(), "offset": start, "count": end - start})
+        elif requested is None and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": os.fspath(self.path)})
+        else:
+            await self._send_mapped(send, start, end)
+        if self.background is not None:
+            await self.background()
+
+    async def _send_mapped(self, send: Send, start: int, end: int) -> None:
+        with open(self.path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            offset = start
+            while offset < end:
+                stop = min(offset + self.chunk_size, end)
+                # Slicing can fault pages in from disk, so it stays off the event loop
+                chunk = await anyio.to_thread.run_sync(mapped.__getitem__, slice(offset, stop))
+                offset = stop
+                await send({"type": "http.response.body", "body": chunk, "more_body": offset < end})
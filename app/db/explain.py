@@ -0,0 +1,36 @@
+import json
+from typing import Iterator, List
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+def _plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+async def full_table_scans(conn: AsyncConnection, statement: str, parameters=()) -> List[str]:
+    """Plan steps that read a whole table when ``statement`` runs with ``parameters``.
+
+    ``statement`` is driver-level SQL as seen by ``before_cursor_execute``.
+    SQLite reports ``SCAN`` steps of ``EXPLAIN QUERY PLAN``, including full
+    index scans. PostgreSQL reports ``Seq Scan`` nodes of ``EXPLAIN (FORMAT
+    JSON)`` with sequential scans disabled, so a small table is not scanned
+    just because it is small and only genuinely unindexed access shows up.
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        rows = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [detail for *_, detail in rows if detail.startswith("SCAN ") and detail != "SCAN CONSTANT ROW"]
+    if dialect == "postgresql":
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return [
+            f"Seq Scan on {node['Relation Name']}"
+            for node in _plan_nodes(plan[0]["Plan"])
+            if node["Node Type"] == "Seq Scan"
+        ]
+    raise NotImplementedError(f"No query plan support for {dialect}")
@@ -0,0 +1,106 @@
+import contextvars
+import logging
+import re
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.metrics import record_db_time
+
+logger = logging.getLogger("app.db.queries")
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+|:\w+))*\s*\)")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|(?<!:):\w+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse literals, placeholders and IN-lists so statements of one shape compare equal."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _PLACEHOLDER_LIST.sub("(...)", sql)
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Raw statement text -> executions; SQLAlchemy emits bound parameters, so the
+        # text is already a statement shape and needs no normalizing on the hot path
+        self.statements: Dict[str, int] = {}
+
+    def n_plus_one_suspects(self, threshold: int) -> Dict[str, int]:
+        suspects: Dict[str, int] = {}
+        for statement, count in self.statements.items():
+            shape = normalize_sql(statement)
+            suspects[shape] = suspects.get(shape, 0) + count
+        return {shape: count for shape, count in suspects.items() if count >= threshold}
+
+
+query_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar("query_stats", default=None)
+
+
+def instrument_engine(engine):
+    """Time every statement, feed the per-request stats and log slow queries."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        record_db_time(elapsed)
+        stats = query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+        if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, normalize_sql(statement))
+
+    @event.listens_for(engine, "handle_error")
+    def _discard_timer(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+
+class QueryInstrumentationMiddleware:
+    """Tracks queries per request, flags N+1 suspects and, in debug mode, reports them as headers."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.seconds * 1000:.2f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_stats.reset(token)
+            if stats.count >= settings.N_PLUS_ONE_THRESHOLD:
+                route = getattr(scope.get("route"), "path", scope.get("path"))
+                for shape, count in stats.n_plus_one_suspects(settings.N_PLUS_ONE_THRESHOLD).items():
+                    logger.warning("Possible N+1 in %s %s: %d x %s", scope["method"], route, count, shape)
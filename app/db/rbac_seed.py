@@ -0,0 +1,178 @@
+"""Declarative RBAC catalog sync.
+
+The catalog file lists roles, modules, resources (each naming its module),
+permissions and grants. ``grants`` maps a role to ``{resource: [permission, ...]}``;
+``"*"`` stands for every resource or every permission. ``sync_rbac`` reads
+each table once, diffs by name and writes only what changed with bulk
+``INSERT ... ON CONFLICT DO NOTHING`` (``INSERT OR IGNORE`` on SQLite), so a
+rerun against an up-to-date database issues only the reads.
+
+    python -m app.db.rbac_seed [--catalog path.json] [--prune] [--dry-run]
+"""
+import argparse
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, delete, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models.user import Module, Permission, Resource, Role, RoleResourcePermission
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(__file__), "rbac_catalog.json")
+
+Grant = Tuple[int, int, int]
+
+
+class CatalogError(ValueError):
+    """The catalog file references names it does not define."""
+
+
+@dataclass
+class SyncReport:
+    inserted: Dict[str, int] = field(default_factory=dict)
+    updated: Dict[str, int] = field(default_factory=dict)
+    deleted: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def changed(self) -> bool:
+        return any((*self.inserted.values(), *self.updated.values(), *self.deleted.values()))
+
+    def __str__(self) -> str:
+        parts = [
+            f"{verb} {count} {table}"
+            for verb, counts in (("inserted", self.inserted), ("updated", self.updated), ("deleted", self.deleted))
+            for table, count in counts.items()
+            if count
+        ]
+        return ", ".join(parts) or "RBAC catalog already up to date"
+
+
+def load_catalog(path: Optional[str] = None) -> dict:
+    with open(path or DEFAULT_CATALOG) as fh:
+        return json.load(fh)
+
+
+def insert_ignore(db: Session, table):
+    """An INSERT that skips rows violating a unique constraint, on the session's dialect."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        return pg_insert(table).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return insert(table).prefix_with("OR IGNORE")
+    return insert(table)
+
+
+def _sync_named(db: Session, model, rows: List[dict], report: SyncReport, dry_run: bool) -> Dict[str, int]:
+    """Insert missing rows and update changed ones by name; return name -> id."""
+    table = model.__table__
+    columns = [name for name in rows[0] if name != "name"] if rows else []
+    existing = {
+        row.name: row
+        for row in db.execute(select(table.c.id, table.c.name, *(table.c[name] for name in columns)))
+    }
+    missing = [row for row in rows if row["name"] not in existing]
+    changed = [
+        row for row in rows
+        if row["name"] in existing and any(getattr(existing[row["name"]], name) != row[name] for name in columns)
+    ]
+    report.inserted[table.name] = len(missing)
+    report.updated[table.name] = len(changed)
+    ids = {name: row.id for name, row in existing.items()}
+    if dry_run:
+        # Placeholder ids let grants on rows this run would add be counted
+        ids.update((row["name"], -position) for position, row in enumerate(missing, 1))
+        return ids
+    if missing:
+        db.execute(insert_ignore(db, table), missing)
+        ids.update(db.execute(
+            select(table.c.name, table.c.id).where(table.c.name.in_([row["name"] for row in missing]))
+        ).all())
+    if changed:
+        statement = (
+            update(table)
+            .where(table.c.name == bindparam("_name"))
+            .values({name: bindparam(f"_{name}") for name in columns})
+        )
+        db.execute(statement, [{f"_{name}": value for name, value in row.items()} for row in changed])
+    return ids
+
+
+def _resolve(names: Iterable[str], ids: Dict[str, int], kind: str) -> List[int]:
+    unknown = [name for name in names if name not in ids]
+    if unknown:
+        raise CatalogError(f"unknown {kind}: {', '.join(sorted(unknown))}")
+    return [ids[name] for name in names]
+
+
+def expand_grants(catalog: dict, roles: Dict[str, int], resources: Dict[str, int], permissions: Dict[str, int]) -> Set[Grant]:
+    grants: Set[Grant] = set()
+    resource_names = [resource["name"] for resource in catalog["resources"]]
+    permission_names = [permission["name"] for permission in catalog["permissions"]]
+    for role_name, by_resource in catalog.get("grants", {}).items():
+        (role_id,) = _resolve([role_name], roles, "role")
+        for resource_name, granted in by_resource.items():
+            resource_ids = _resolve(resource_names if resource_name == "*" else [resource_name], resources, "resource")
+            permission_ids = _resolve(permission_names if granted == "*" else granted, permissions, "permission")
+            grants.update((role_id, resource_id, permission_id) for resource_id in resource_ids for permission_id in permission_ids)
+    return grants
+
+
+def sync_rbac(db: Session, catalog: dict, prune: bool = False, dry_run: bool = False) -> SyncReport:
+    """Bring the RBAC tables in line with ``catalog``; the caller commits.
+
+    With ``prune``, grants that the catalog does not list are deleted; roles,
+    resources and permissions are never deleted since users and grants
+    reference them.
+    """
+    report = SyncReport()
+    roles = _sync_named(db, Role, catalog["roles"], report, dry_run)
+    modules = _sync_named(db, Module, catalog["modules"], report, dry_run)
+    permissions = _sync_named(db, Permission, catalog["permissions"], report, dry_run)
+    resource_rows = [
+        {
+            "name": resource["name"],
+            "description": resource.get("description"),
+            "module_id": _resolve([resource["module"]], modules, "module")[0] if resource.get("module") else None,
+        }
+        for resource in catalog["resources"]
+    ]
+    resources = _sync_named(db, Resource, resource_rows, report, dry_run)
+
+    table = RoleResourcePermission.__table__
+    existing = set(db.execute(select(table.c.role_id, table.c.resource_id, table.c.permission_id)).all())
+    wanted = expand_grants(catalog, roles, resources, permissions)
+    missing = wanted - existing
+    stale = existing - wanted if prune else set()
+    report.inserted[table.name] = len(missing)
+    report.deleted[table.name] = len(stale)
+    if not dry_run:
+        if missing:
+            db.execute(
+                insert_ignore(db, table),
+                [{"role_id": r, "resource_id": res, "permission_id": p} for r, res, p in sorted(missing)],
+            )
+        if stale:
+            db.execute(delete(table).where(
+                tuple_(table.c.role_id, table.c.resource_id, table.c.permission_id).in_(sorted(stale))
+            ))
+    return report
+
+
+def main(argv=None) -> int:
+    from app.db import seed_rbac
+
+    parser = argparse.ArgumentParser(description="Sync the RBAC tables with a catalog file.")
+    parser.add_argument("--catalog", help=f"catalog JSON (default {DEFAULT_CATALOG})")
+    parser.add_argument("--prune", action="store_true", help="delete grants the catalog does not list")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without writing them")
+    args = parser.parse_args(argv)
+    print(seed_rbac(args.catalog, prune=args.prune, dry_run=args.dry_run))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,152 @@
+import contextvars
+import itertools
+import math
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.requests import cookie_parser
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class ReplicaSet:
+    """Round-robin over replica engines, skipping any that recently failed to connect."""
+
+    def __init__(self, engines: Iterable[Engine], cooldown: float):
+        self.engines: List[Engine] = list(engines)
+        self.cooldown = cooldown
+        self._down_until = {}
+        self._cycle = itertools.cycle(range(len(self.engines)))
+        self._lock = threading.Lock()
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, exception_context):
+        if exception_context.is_disconnect or exception_context.connection is None:
+            self.mark_down(exception_context.engine)
+
+    def mark_down(self, engine: Engine):
+        self._down_until[engine] = time.monotonic() + self.cooldown
+
+    def healthy(self, engine: Engine) -> bool:
+        return self._down_until.get(engine, 0.0) <= time.monotonic()
+
+    def choose(self) -> Optional[Engine]:
+        """The next healthy replica, or None when every replica is cooling down."""
+        with self._lock:
+            for _ in range(len(self.engines)):
+                engine = self.engines[next(self._cycle)]
+                if self.healthy(engine):
+                    return engine
+        return None
+
+
+class RoutingSession(Session):
+    """Sends plain SELECTs to a replica and everything else to the session's own bind.
+
+    The replica is picked once per session so a request reads one consistent
+    snapshot. The first write, flush or SELECT ... FOR UPDATE pins the rest of
+    the session to the primary, so a request always reads its own writes;
+    ``use_primary`` pins it up front.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary = super().get_bind(mapper, clause=clause, **kw)
+        replicas: Optional[ReplicaSet] = self.info.get("replicas")
+        if replicas is None or not replicas.engines or self.info.get("primary"):
+            return primary
+        if self._flushing or not getattr(clause, "is_select", False) or getattr(clause, "_for_update_arg", None) is not None:
+            self.info["primary"] = True
+            return primary
+        if "replica" not in self.info:
+            self.info["replica"] = replicas.choose()
+        return self.info["replica"] or primary
+
+
+def use_primary(db) -> None:
+    """Route the rest of this session, reads included, to the primary."""
+    db.info["primary"] = True
+
+
+# Keys of rows written in the last READ_YOUR_WRITES_WINDOW seconds, by this process
+recent_writes = TTLCache(maxsize=100_000, ttl=settings.READ_YOUR_WRITES_WINDOW)
+
+WRITE_MARKER_COOKIE = "last_write"
+
+
+class WriteMarker:
+    """When the requesting client last wrote, and whether this request writes."""
+
+    __slots__ = ("last_write", "wrote")
+
+    def __init__(self, last_write: float):
+        self.last_write = last_write
+        self.wrote = False
+
+
+write_marker: contextvars.ContextVar[Optional[WriteMarker]] = contextvars.ContextVar("write_marker", default=None)
+
+
+def remember_write(*keys: str) -> None:
+    for key in keys:
+        recent_writes.set(key, True)
+    marker = write_marker.get()
+    if marker is not None:
+        marker.wrote = True
+
+
+def read_your_writes(db, *keys: str) -> None:
+    """Read from the primary if any of ``keys`` was written within the window.
+
+    Writes made through another worker are only known from the client's
+    write-marker cookie, which sends all of that client's reads to the primary.
+    """
+    marker = write_marker.get()
+    if marker is not None and time.time() - marker.last_write < settings.READ_YOUR_WRITES_WINDOW:
+        use_primary(db)
+    elif any(key in recent_writes for key in keys):
+        use_primary(db)
+
+
+def _cookie_time(scope) -> float:
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            try:
+                return float(cookie_parser(value.decode("latin-1")).get(WRITE_MARKER_COOKIE, 0))
+            except ValueError:
+                return 0.0
+    return 0.0
+
+
+class ReadYourWritesMiddleware:
+    """Carries a client's last write time in a cookie, so reads on any worker can honour it."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        marker = WriteMarker(_cookie_time(scope))
+        token = write_marker.set(marker)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and marker.wrote:
+                cookie = (
+                    f"{WRITE_MARKER_COOKIE}={time.time():.3f}; Max-Age={math.ceil(settings.READ_YOUR_WRITES_WINDOW)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            write_marker.reset(token)
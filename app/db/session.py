@@ -1,14 +1,99 @@
-from sqlalchemy import create_engine
+from typing import List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
+from app.core.config import Settings, settings
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, apply_sqlite_pragmas
+from app.db.instrumentation import instrument_engine
+from app.db.routing import ReplicaSet, RoutingSession
+
+# The session factories exist from import time but stay unbound until
+# init_engines() runs, so importing the app never loads a driver or opens a pool.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False, sync_session_class=RoutingSession)
+
+_engines: dict = {}
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.split("://", 1)[-1] in ("", "/", "/:memory:") or "mode=memory" in url
+
+def engine_options(url: str, poolclass, config: Settings = settings) -> dict:
+    """Pool and connect arguments for an engine on ``url``."""
+    if url.startswith("sqlite"):
+        options = {"connect_args": {"check_same_thread": False}}
+        if not _is_memory_sqlite(url):
+            options["poolclass"] = poolclass
+        return options
+    return {
+        "poolclass": poolclass,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+    }
+
+def init_engines(config: Settings = settings) -> Tuple[Engine, AsyncEngine]:
+    """Create the sync and async engines and bind the session factories to them.
+
+    Safe to call repeatedly; the first call's settings win. The async engine
+    serves the API, the sync engine seeding, migrations and scripts. API
+    sessions send plain reads to the DATABASE_REPLICA_URLS engines, if any.
+    """
+    if _engines:
+        return _engines["engine"], _engines["async_engine"]
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    database_url = config.get_database_url
+    async_database_url = config.get_async_database_url
+
+    engine = create_engine(database_url, **engine_options(database_url, InstrumentedQueuePool, config))
+
+    def create_async(url: str) -> AsyncEngine:
+        async_options = engine_options(url, InstrumentedAsyncQueuePool, config)
+        if url.startswith("sqlite"):
+            async_options.pop("connect_args")
+        async_engine = create_async_engine(url, **async_options)
+        if url.startswith("sqlite"):
+            apply_sqlite_pragmas(async_engine.sync_engine, config.SQLITE_BUSY_TIMEOUT_MS, config.SQLITE_MMAP_SIZE)
+        instrument_engine(async_engine.sync_engine)
+        return async_engine
+
+    async_engine = create_async(async_database_url)
+    replica_engines = [create_async(url) for url in config.get_async_replica_urls]
+
+    if database_url.startswith("sqlite"):
+        apply_sqlite_pragmas(engine, config.SQLITE_BUSY_TIMEOUT_MS, config.SQLITE_MMAP_SIZE)
+    instrument_engine(engine)
+
+    replicas = ReplicaSet([replica.sync_engine for replica in replica_engines], config.REPLICA_COOLDOWN)
+    SessionLocal.configure(bind=engine)
+    AsyncSessionLocal.configure(bind=async_engine, info={"replicas": replicas})
+    _engines.update(engine=engine, async_engine=async_engine, replica_engines=replica_engines)
+    return engine, async_engine
+
+def replica_engines() -> List[AsyncEngine]:
+    init_engines()
+    return _engines["replica_engines"]
 
-# Use the new get_database_url method
-database_url = settings.get_database_url
+async def dispose_engines():
+    """Close pooled connections; the engines reconnect on next use."""
+    if _engines:
+        await _engines["async_engine"].dispose()
+        for replica in _engines["replica_engines"]:
+            await replica.dispose()
+        _engines["engine"].dispose()
 
-# Configure engine based on database type
-if database_url.startswith("sqlite"):
-    engine = create_engine(database_url, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(database_url)
+def __getattr__(name):
+    # ``from app.db.session import engine`` keeps working for scripts and tests
+    if name in ("engine", "async_engine"):
+        init_engines()
+        return _engines[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) 
\ No newline at end of file
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
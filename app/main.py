@@ -1,11 +1,101 @@
-from fastapi import FastAPI
+import math
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
 from app.core.config import settings
-from app.api import user_router
+from app.core.responses import FastJSONResponse
+from app.core.hashing import HasherSaturated, password_hasher
+from app.core.rate_limit import RateLimited
+from app.db.session import AsyncSessionLocal, dispose_engines, init_engines
+from app.services.cache_versions import cache_version_watcher
+from app.services.ota_rollout import rollout_scheduler
+from app.services.telemetry_ingest import telemetry_ingestor
+from app.services.token_revocation import revocation_store
+from app.api import user_router, internal_router, metrics_router, telemetry_router, firmware_router, ota_router, cleaning_router
+from app.core.metrics import MetricsMiddleware
+from app.db.instrumentation import QueryInstrumentationMiddleware
+from app.db.routing import ReadYourWritesMiddleware
+
+async def hasher_saturated_handler(request: Request, exc: HasherSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"success": False, "message": "Server is busy, please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
+
+async def rate_limited_handler(request: Request, exc: RateLimited):
+    return JSONResponse(
+        status_code=429,
+        content={"success": False, "message": "Too many login attempts, please retry later."},
+        headers={"Retry-After": str(int(exc.retry_after))},
+    )
 
-app = FastAPI(title=settings.PROJECT_NAME)
+def _json_safe(value):
+    """Replace values JSON cannot carry: NaN/Infinity become null, integers past 64 bits strings."""
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, int) and not isinstance(value, bool) and not -2**63 <= value < 2**64:
+        return str(value)
+    return value
+
+async def validation_error_handler(request: Request, exc: RequestValidationError):
+    # FastAPI's own handler echoes the rejected input and fails to render it when it is a NaN or a huge integer
+    return FastJSONResponse(status_code=422, content={"detail": _json_safe(jsonable_encoder(exc.errors()))})
 
-@app.get("/")
 def read_root():
     return {"message": "Welcome to the FastAPI backend!"}
 
-app.include_router(user_router) 
\ No newline at end of file
+def create_app() -> FastAPI:
+    """Build the application; engines, worker pools and caches are set up by its lifespan.
+
+    Configuration comes from the process-wide ``settings``, and the hasher,
+    ingestor, scheduler and engines the lifespan starts are module singletons
+    shared by every app built here, so serve one app per process. Serve with
+    ``uvicorn app.main:app`` or ``uvicorn --factory app.main:create_app``.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        init_engines()
+        await password_hasher.start()
+        async with AsyncSessionLocal() as db:
+            await revocation_store.load(db)
+        await telemetry_ingestor.start()
+        await rollout_scheduler.start()
+        await cache_version_watcher.start()
+        yield
+        await cache_version_watcher.stop()
+        await rollout_scheduler.stop()
+        await telemetry_ingestor.stop()
+        password_hasher.shutdown()
+        await dispose_engines()
+
+    app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan, default_response_class=FastJSONResponse)
+
+    app.add_middleware(ReadYourWritesMiddleware)
+    app.add_middleware(QueryInstrumentationMiddleware)
+    app.add_middleware(MetricsMiddleware)
+
+    app.add_exception_handler(HasherSaturated, hasher_saturated_handler)
+    app.add_exception_handler(RateLimited, rate_limited_handler)
+    app.add_exception_handler(RequestValidationError, validation_error_handler)
+
+    app.get("/")(read_root)
+
+    app.include_router(user_router)
+    app.include_router(internal_router)
+    app.include_router(metrics_router)
+    app.include_router(telemetry_router)
+    app.include_router(firmware_router)
+    app.include_router(ota_router)
+    app.include_router(cleaning_router)
+    return app
+
+app = create_app()
@@ -0,0 +1 @@
+from app.models import user, token, cache, telemetry, firmware, ota, cleaning  # noqa: F401
@@ -0,0 +1,9 @@
+from sqlalchemy import BigInteger, Column, String
+
+from app.models.user import Base
+
+class CacheVersion(Base):
+    """Shared invalidation counter for a per-process cache, bumped by every committed write it depends on."""
+    __tablename__ = "cache_versions"
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
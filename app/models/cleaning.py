@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+
+from app.models.user import Base
+
+class CleaningLog(Base):
+    __tablename__ = "cleaning_logs"
+    id = Column(Integer, primary_key=True)
+    device_id = Column(String, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # When the clean happened, as reported by the cleaner
+    cleaned_at = Column(DateTime, nullable=False)
+    notes = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Per-device history, newest first
+    __table_args__ = (Index("ix_cleaning_logs_device_id", "device_id", "id"),)
@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String
+
+from app.models.user import Base
+
+class FirmwareArtifact(Base):
+    __tablename__ = "firmware_artifacts"
+    id = Column(Integer, primary_key=True)
+    # Hex SHA-256 of the image; also its address in the firmware store
+    sha256 = Column(String(64), unique=True, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    version = Column(String, nullable=False)
+    filename = Column(String, nullable=True)
+    uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Index, Integer, String
+
+from app.models.user import Base
+
+class OtaRollout(Base):
+    __tablename__ = "ota_rollouts"
+    id = Column(Integer, primary_key=True)
+    sha256 = Column(String(64), nullable=False)
+    version = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    # Cumulative fractions of the device set, comma-separated, e.g. "0.01,0.1,1.0"
+    waves = Column(String, nullable=False)
+    # Index of the last released wave, -1 before the first
+    wave = Column(Integer, nullable=False, default=-1)
+    status = Column(String, nullable=False, default="active")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class OtaTarget(Base):
+    __tablename__ = "ota_targets"
+    rollout_id = Column(Integer, ForeignKey("ota_rollouts.id"), primary_key=True)
+    device_id = Column(String, primary_key=True)
+    wave = Column(Integer, nullable=False)
+    # Position in the rollout's hash order; breaks ties within a released wave
+    rank = Column(Integer, nullable=False)
+    state = Column(String, nullable=False, default="waiting")
+    attempts = Column(Integer, nullable=False, default=0)
+    # Order in which the device's wave was released, across all rollouts
+    release_seq = Column(Integer, nullable=True)
+    # Epoch seconds at which a download lease lapses
+    lease_expires_at = Column(Float, nullable=True)
+    __table_args__ = (
+        # The dispatch queue: queued devices in release order
+        Index("ix_ota_targets_state_release", "state", "release_seq", "rank"),
+        Index("ix_ota_targets_device_state", "device_id", "state"),
+        Index("ix_ota_targets_rollout_wave", "rollout_id", "wave", "state"),
+    )
+
+class OtaSchedulerState(Base):
+    """Single row shared by every worker; updating it serializes scheduler transactions."""
+    __tablename__ = "ota_scheduler_state"
+    id = Column(Integer, primary_key=True)
+    egress_tokens = Column(Float, nullable=False, default=0.0)
+    refilled_at = Column(Float, nullable=False, default=0.0)
+    release_seq = Column(Integer, nullable=False, default=0)
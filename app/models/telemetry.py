@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger, Column, Float, Index, Integer, String
+
+from app.models.user import Base
+
+class TelemetryReading(Base):
+    __tablename__ = "telemetry_readings"
+    # BIGINT on PostgreSQL; SQLite only autoincrements an INTEGER primary key
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    device_id = Column(String, nullable=False)
+    metric = Column(String, nullable=False)
+    # Device timestamp in milliseconds since the epoch
+    ts_ms = Column(BigInteger, nullable=False)
+    value = Column(Float, nullable=False)
+    # Serves per-device, per-metric range scans in time order
+    __table_args__ = (Index("ix_telemetry_readings_device_metric_ts", "device_id", "metric", "ts_ms"),)
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, DateTime, String
+
+from app.models.user import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    jti = Column(String, primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
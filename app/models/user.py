@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Table, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index, Table, UniqueConstraint
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -6,15 +6,19 @@ Base = declarative_base()
 # Association Table for RBAC
 class RoleResourcePermission(Base):
     __tablename__ = "role_resource_permissions"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     role_id = Column(Integer, ForeignKey("roles.id"), nullable=False)
     resource_id = Column(Integer, ForeignKey("resources.id"), nullable=False)
     permission_id = Column(Integer, ForeignKey("permissions.id"), nullable=False)
-    __table_args__ = (UniqueConstraint('role_id', 'resource_id', 'permission_id', name='_role_resource_permission_uc'),)
+    # The unique constraint serves lookups by role; the index serves "which roles can do P on R"
+    __table_args__ = (
+        UniqueConstraint('role_id', 'resource_id', 'permission_id', name='_role_resource_permission_uc'),
+        Index('ix_role_resource_permissions_resource_permission', 'resource_id', 'permission_id', 'role_id'),
+    )
 
 class User(Base):
     __tablename__ = "users"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     username = Column(String, unique=True, index=True, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     full_name = Column(String, nullable=True)
@@ -23,10 +27,12 @@ class User(Base):
     goaccess_id = Column(String, nullable=True)
     role_id = Column(Integer, ForeignKey("roles.id"))
     role = relationship("Role", back_populates="users")
+    # Role filter plus keyset order for the user listing
+    __table_args__ = (Index('ix_users_role_id', 'role_id', 'id'),)
 
 class Role(Base):
     __tablename__ = "roles"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
     description = Column(String, nullable=True)
     users = relationship("User", back_populates="role")
@@ -34,14 +40,14 @@ class Role(Base):
 
 class Module(Base):
     __tablename__ = "modules"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
     description = Column(String, nullable=True)
     resources = relationship("Resource", back_populates="module")
 
 class Resource(Base):
     __tablename__ = "resources"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
     description = Column(String, nullable=True)
     module_id = Column(Integer, ForeignKey("modules.id"))
@@ -50,7 +56,7 @@ class Resource(Base):
 
 class Permission(Base):
     __tablename__ = "permissions"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
     description = Column(String, nullable=True)
     permissions = relationship("RoleResourcePermission", backref="permission") 
\ No newline at end of file
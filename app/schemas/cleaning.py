@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+class CleaningLogCreate(BaseModel):
+    device_id: str = Field(min_length=1, max_length=128)
+    # Defaults to the time the server receives the log
+    cleaned_at: Optional[datetime] = None
+    notes: Optional[str] = Field(None, max_length=2000)
+
+class CleaningLogRead(BaseModel):
+    id: int
+    device_id: str
+    user_id: int
+    cleaned_at: datetime
+    notes: Optional[str] = None
+
+    class Config:
+        from_attributes = True
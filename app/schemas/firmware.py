@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+class FirmwareArtifactOut(BaseModel):
+    id: int
+    sha256: str
+    size: int
+    version: str
+    filename: Optional[str] = None
+    uploaded_by: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,29 @@
+from typing import Dict, List, Literal
+
+from pydantic import BaseModel, Field
+
+class RolloutCreate(BaseModel):
+    sha256: str = Field(pattern=r"^[0-9a-f]{64}$")
+    device_ids: List[str] = Field(min_length=1, max_length=1_000_000)
+    # Cumulative fractions of the device set released in turn
+    waves: List[float] = Field(default=[0.01, 0.1, 1.0], min_length=1, max_length=20)
+
+class RolloutStatus(BaseModel):
+    id: int
+    sha256: str
+    version: str
+    status: str
+    wave: int
+    waves: List[float]
+    devices: Dict[str, int]
+
+class OtaAssignment(BaseModel):
+    rollout_id: int
+    sha256: str
+    version: str
+    size: int
+    download_url: str
+    lease_expires_in: float
+
+class OtaReport(BaseModel):
+    status: Literal["completed", "failed"]
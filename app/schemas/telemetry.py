@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class TelemetryReadingIn(BaseModel):
+    device_id: str = Field(min_length=1, max_length=128)
+    metric: str = Field(min_length=1, max_length=128)
+    ts_ms: int = Field(ge=-2**63, lt=2**63)
+    value: float = Field(allow_inf_nan=False)
+
+class TelemetryBatch(BaseModel):
+    readings: List[TelemetryReadingIn] = Field(min_length=1, max_length=10000)
+
+class TelemetryAccepted(BaseModel):
+    accepted: int
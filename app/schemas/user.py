@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -26,6 +26,10 @@ class UserRead(UserBase):
     class Config:
         from_attributes = True
 
+class UserPage(BaseModel):
+    items: List[UserRead]
+    next_cursor: Optional[str] = None
+
 class UserLogin(BaseModel):
     username: str
     password: str
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.rbac_seed import insert_ignore
+from app.db.routing import use_primary
+from app.db.session import AsyncSessionLocal
+from app.models.cache import CacheVersion
+
+logger = logging.getLogger(__name__)
+
+_table = CacheVersion.__table__
+
+
+def bump_shared(db: Session, *names: str) -> None:
+    """Increment the shared counters in the session's current transaction.
+
+    Called from flush events and after Core writes, so the bump commits or
+    rolls back together with the change it announces.
+    """
+    db.execute(insert_ignore(db, _table), [{"name": name, "version": 0} for name in names])
+    db.execute(update(_table).where(_table.c.name.in_(names)).values(version=_table.c.version + 1))
+
+
+class CacheVersionWatcher:
+    """Polls ``cache_versions`` and invalidates local caches when another process bumped them.
+
+    Each process invalidates its own caches immediately on commit; the watcher
+    carries those invalidations to every other worker (and picks up CLI runs
+    such as ``seed_rbac``) within ``interval`` seconds, without adding a
+    query to any request.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._callbacks: Dict[str, List[Callable[[], object]]] = {}
+        self._seen: Dict[str, int] = {}
+        self._polled = False
+        self._task: Optional[asyncio.Task] = None
+
+    def watch(self, name: str, callback: Callable[[], object]):
+        self._callbacks.setdefault(name, []).append(callback)
+
+    async def poll(self) -> List[str]:
+        """Read the counters once and run the callbacks of those that moved; returns their names."""
+        async with AsyncSessionLocal() as db:
+            use_primary(db)
+            rows = await db.execute(select(_table.c.name, _table.c.version).where(_table.c.name.in_(self._callbacks)))
+            versions = dict(rows.all())
+        # The first poll only sets the baseline; after that a counter row appearing counts as a change
+        changed = [name for name, version in versions.items() if self._seen.get(name, 0 if self._polled else version) != version]
+        self._seen.update(versions)
+        self._polled = True
+        for name in changed:
+            for callback in self._callbacks[name]:
+                callback()
+        return changed
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll()
+            except Exception:
+                logger.exception("Cache version poll failed")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+cache_version_watcher = CacheVersionWatcher(settings.CACHE_VERSION_POLL_INTERVAL)
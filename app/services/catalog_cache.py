@@ -0,0 +1,90 @@
+import hashlib
+import json
+import threading
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.user import Module, Permission, Resource, Role
+from app.services.cache_versions import bump_shared, cache_version_watcher
+
+CATALOG_MODELS = (Role, Module, Resource, Permission)
+# Name of the shared counter other workers watch for catalog changes
+SHARED_VERSION = "catalog"
+
+
+class CatalogEntry(NamedTuple):
+    version: int
+    body: bytes
+    etag: str
+
+
+class CatalogCache:
+    """Pre-serialized JSON bodies for the RBAC catalog endpoints, tagged with a strong ETag.
+
+    Entries are valid for the catalog version they were built at; any
+    committed write to a catalog table bumps the version, here at once and
+    in other processes through the shared ``catalog`` counter.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._lock = threading.Lock()
+
+    def bump_version(self) -> int:
+        with self._lock:
+            self.version += 1
+            return self.version
+
+    def get(self, name: str) -> Optional[CatalogEntry]:
+        entry = self._entries.get(name)
+        if entry is not None and entry.version == self.version:
+            return entry
+        return None
+
+    async def get_or_build(self, name: str, loader: Callable[[], Awaitable[object]]) -> CatalogEntry:
+        entry = self.get(name)
+        if entry is not None:
+            return entry
+        version = self.version
+        body = json.dumps(await loader(), separators=(",", ":")).encode()
+        entry = CatalogEntry(version, body, '"%s"' % hashlib.sha256(body).hexdigest()[:32])
+        self._entries[name] = entry
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+catalog_cache = CatalogCache()
+cache_version_watcher.watch(SHARED_VERSION, catalog_cache.bump_version)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_catalog_writes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, CATALOG_MODELS):
+            if not session.info.get("catalog_dirty"):
+                bump_shared(session, SHARED_VERSION)
+            session.info["catalog_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    if session.info.pop("catalog_dirty", False):
+        catalog_cache.bump_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("catalog_dirty", None)
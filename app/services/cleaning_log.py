@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import AsyncSessionLocal
+from app.models.cleaning import CleaningLog
+
+logger = logging.getLogger(__name__)
+
+_table = CleaningLog.__table__
+
+Pending = Tuple[dict, asyncio.Future]
+
+
+class _CommitFailed(Exception):
+    """The commit itself raised, so whether the rows were stored is unknown."""
+
+
+class GroupCommitter:
+    """Coalesces concurrent cleaning-log inserts into shared transactions.
+
+    The first row to arrive starts a flusher task which waits up to
+    ``window`` seconds (less once ``max_batch`` rows are waiting), then writes
+    everything pending with one multi-row ``INSERT ... RETURNING`` and a
+    single commit. Rows that arrive during a commit form the next batch,
+    which is written as soon as that commit finishes. Each caller's future
+    resolves with its row id only after the commit, so an id is never handed
+    out for a row that could still be rolled back. If the insert fails, the
+    batch's rows are retried one per transaction so a bad row fails alone; if
+    the commit fails the rows may or may not have been stored, so every
+    caller in the batch gets the error rather than risking duplicates.
+
+    Not thread-safe; used from the event loop only.
+    """
+
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Pending] = []
+        self._full: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def submit(self, row: dict) -> int:
+        """Queue one row and wait until it is committed; returns its id."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+        if self._flusher is None:
+            self._full = asyncio.Event()
+            self._flusher = asyncio.create_task(self._flush())
+        elif len(self._pending) >= self.max_batch:
+            self._full.set()
+        # A caller that gives up must not cancel the commit the others are waiting on
+        return await asyncio.shield(future)
+
+    async def _flush(self):
+        try:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                self._pending = self._pending[self.max_batch:]
+                await self._commit(batch)
+        finally:
+            self._flusher = None
+            self._full = None
+
+    async def _commit(self, batch: List[Pending]):
+        try:
+            ids = await self._write([row for row, _ in batch])
+        except _CommitFailed as exc:
+            logger.error("Commit of %d cleaning logs failed, outcome unknown: %s", len(batch), exc.__cause__)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc.__cause__)
+            return
+        except Exception as exc:
+            if len(batch) > 1:
+                logger.warning("Group commit of %d cleaning logs failed, retrying row by row: %s", len(batch), exc)
+                for item in batch:
+                    await self._commit([item])
+                return
+            _, future = batch[0]
+            if not future.done():
+                future.set_exception(exc)
+            return
+        CLEANING_LOG_BATCH.labels().observe(len(batch))
+        for (_, future), row_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(row_id)
+
+    async def _write(self, rows: List[dict]) -> List[int]:
+        statement = insert(_table).returning(_table.c.id, sort_by_parameter_order=True)
+        async with AsyncSessionLocal() as db:
+            ids = (await db.execute(statement, rows)).scalars().all()
+            try:
+                await db.commit()
+            except Exception as exc:
+                raise _CommitFailed() from exc
+        return ids
+
+
+CLEANING_LOG_BATCH = registry.histogram(
+    "cleaning_log_commit_batch_size", "Cleaning logs written per group commit.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+cleaning_log_committer = GroupCommitter(
+    window=settings.CLEANING_LOG_COMMIT_WINDOW,
+    max_batch=settings.CLEANING_LOG_MAX_BATCH,
+)
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+
+import anyio
+
+from app.core.config import settings
+
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ArtifactTooLarge(Exception):
+    """Raised when an upload exceeds the configured size cap."""
+
+
+class FirmwareStore:
+    """Content-addressed blob store: each image lives at ``root/ab/<sha256>``.
+
+    Uploads stream into a temporary file under ``root/incoming`` while the
+    digest is computed, and are renamed into place once complete, so a
+    partially written image is never visible under its address. Storing the
+    same bytes twice keeps the first copy.
+    """
+
+    def __init__(self, root: str, max_bytes: int, write_buffer: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.write_buffer = write_buffer
+
+    @staticmethod
+    def is_digest(value: str) -> bool:
+        return _DIGEST.match(value) is not None
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def locate(self, digest: str) -> Optional[Tuple[Path, int]]:
+        """Path and size of a stored image, ``None`` if the digest is unknown."""
+        if not self.is_digest(digest):
+            return None
+        path = self.path_for(digest)
+        try:
+            return path, path.stat().st_size
+        except FileNotFoundError:
+            return None
+
+    async def save(self, chunks: AsyncIterator[bytes]) -> Tuple[str, int]:
+        """Write a chunk stream to the store; returns ``(sha256, size)``.
+
+        Chunks are hashed as they arrive and written with one ``writev`` per
+        ``write_buffer`` bytes off the event loop, so memory use is bounded by
+        the buffer, not the image.
+        """
+        incoming = self.root / "incoming"
+        await anyio.to_thread.run_sync(lambda: incoming.mkdir(parents=True, exist_ok=True))
+        fd, tmp_path = await anyio.to_thread.run_sync(lambda: tempfile.mkstemp(dir=incoming))
+        hasher = hashlib.sha256()
+        size = 0
+        pending: List[bytes] = []
+        pending_bytes = 0
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise ArtifactTooLarge(f"Firmware images are limited to {self.max_bytes} bytes")
+                hasher.update(chunk)
+                pending.append(chunk)
+                pending_bytes += len(chunk)
+                if pending_bytes >= self.write_buffer:
+                    await anyio.to_thread.run_sync(_write_all, fd, pending)
+                    pending, pending_bytes = [], 0
+            await anyio.to_thread.run_sync(_write_all, fd, pending)
+            await anyio.to_thread.run_sync(os.fsync, fd)
+        except BaseException:
+            os.close(fd)
+            os.unlink(tmp_path)
+            raise
+        os.close(fd)
+        digest = hasher.hexdigest()
+        await anyio.to_thread.run_sync(self._publish, tmp_path, digest)
+        return digest, size
+
+    def _publish(self, tmp_path: str, digest: str) -> None:
+        final = self.path_for(digest)
+        if final.exists():
+            os.unlink(tmp_path)
+            return
+        final.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, final)
+
+
+def _write_all(fd: int, buffers: List[bytes]) -> None:
+    views = [memoryview(buffer) for buffer in buffers]
+    while views:
+        written = os.writev(fd, views)
+        while views and written >= len(views[0]):
+            written -= len(views[0])
+            views.pop(0)
+        if views and written:
+            views[0] = views[0][written:]
+
+
+firmware_store = FirmwareStore(
+    settings.FIRMWARE_STORAGE_DIR,
+    max_bytes=settings.FIRMWARE_MAX_BYTES,
+    write_buffer=settings.FIRMWARE_WRITE_BUFFER,
+)
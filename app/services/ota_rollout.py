@@ -0,0 +1,376 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.routing import use_primary
+from app.db.session import AsyncSessionLocal
+from app.models.ota import OtaRollout, OtaSchedulerState, OtaTarget
+
+logger = logging.getLogger(__name__)
+
+# Device states within a rollout
+WAITING = "waiting"          # its wave has not been released
+QUEUED = "queued"            # released, waiting for a download slot
+DOWNLOADING = "downloading"  # holds a lease
+COMPLETED = "completed"
+FAILED = "failed"
+
+OPEN_ROLLOUT = ("active", "paused")
+ID_CHUNK = 10000
+
+
+class RolloutError(Exception):
+    """Raised for rollout requests the scheduler cannot accept."""
+
+
+class Assignment(NamedTuple):
+    rollout_id: int
+    sha256: str
+    version: str
+    size: int
+    expires_at: float
+
+
+def wave_bounds(device_count: int, waves: Sequence[float]) -> List[int]:
+    """Index into the hash-ordered device list at which each wave starts, plus the end."""
+    return [0] + [math.ceil(fraction * device_count) for fraction in waves]
+
+
+class RolloutScheduler:
+    """Hands out firmware downloads in waves under fleet-wide concurrency and egress caps.
+
+    Rollouts, per-device state and leases live in the database, so every
+    worker schedules against the same fleet and a restart resumes where it
+    stopped. Scheduler transactions start by updating the single
+    ``ota_scheduler_state`` row, which serializes them across workers; that
+    row also holds the egress token bucket. Queued devices are taken in wave
+    release order, then hash rank, through an index on
+    ``(state, release_seq, rank)``.
+
+    An assignment is a lease: a device that neither completes nor fails within
+    ``lease_seconds`` is re-queued, up to ``max_attempts`` tries. A wave whose
+    failure ratio exceeds ``max_failure_ratio`` pauses its rollout until
+    resumed.
+
+    Each worker keeps a cache of the current assignments, refreshed after
+    its own scheduling transactions and every ``tick_interval`` seconds, and
+    answers long polls from it, so a poll costs no query.
+    """
+
+    def __init__(
+        self,
+        max_active: int,
+        egress_bytes_per_sec: float,
+        lease_seconds: float,
+        max_attempts: int,
+        max_failure_ratio: float,
+        tick_interval: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_active = max_active
+        self.egress_bytes_per_sec = egress_bytes_per_sec
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.max_failure_ratio = max_failure_ratio
+        self.tick_interval = tick_interval
+        self.clock = clock
+        self.assignments: Dict[str, Assignment] = {}
+        self._waiters: Dict[str, asyncio.Event] = {}
+        self._waiting: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def create(self, sha256: str, version: str, size: int, device_ids: Sequence[str], waves: Sequence[float]) -> int:
+        device_ids = list(dict.fromkeys(device_ids))
+        if not device_ids:
+            raise RolloutError("A rollout needs at least one device")
+        if not waves or waves[-1] != 1.0 or any(not a < b for a, b in zip([0.0, *waves], waves)):
+            raise RolloutError("Waves must be increasing fractions in (0, 1] ending at 1.0")
+        async with AsyncSessionLocal() as db:
+            state = await self._lock(db)
+            # Chunked to stay under the driver's bound-parameter limit on large fleets
+            for start in range(0, len(device_ids), ID_CHUNK):
+                busy = await db.scalar(
+                    select(OtaTarget.device_id)
+                    .join(OtaRollout, OtaRollout.id == OtaTarget.rollout_id)
+                    .where(OtaRollout.status.in_(OPEN_ROLLOUT), OtaTarget.device_id.in_(device_ids[start:start + ID_CHUNK]))
+                    .limit(1)
+                )
+                if busy is not None:
+                    raise RolloutError(f"Device {busy!r} is already in an active rollout")
+            rollout = OtaRollout(sha256=sha256, version=version, size=size, waves=",".join(map(str, waves)), wave=-1, status="active")
+            db.add(rollout)
+            await db.flush()
+            ranked = sorted(device_ids, key=lambda device_id: hashlib.sha256(f"{rollout.id}:{device_id}".encode()).digest())
+            bounds = wave_bounds(len(ranked), waves)
+            rows = [
+                {"rollout_id": rollout.id, "device_id": device_id, "wave": wave, "rank": rank, "state": WAITING, "attempts": 0}
+                for wave in range(len(waves))
+                for rank, device_id in enumerate(ranked[bounds[wave]:bounds[wave + 1]], start=bounds[wave])
+            ]
+            await db.execute(insert(OtaTarget.__table__), rows)
+            await self._advance(db, state, rollout)
+            await db.commit()
+            rollout_id = rollout.id
+        await self.dispatch()
+        return rollout_id
+
+    async def status(self, rollout_id: int) -> dict:
+        """Rollout summary with device counts per state; raises ``KeyError`` for unknown ids."""
+        async with AsyncSessionLocal() as db:
+            use_primary(db)
+            rollout = await db.get(OtaRollout, rollout_id)
+            if rollout is None:
+                raise KeyError(rollout_id)
+            counts = dict.fromkeys((WAITING, QUEUED, DOWNLOADING, COMPLETED, FAILED), 0)
+            rows = await db.execute(
+                select(OtaTarget.state, func.count()).where(OtaTarget.rollout_id == rollout_id).group_by(OtaTarget.state)
+            )
+            counts.update(dict(rows.all()))
+            return {
+                "id": rollout.id,
+                "sha256": rollout.sha256,
+                "version": rollout.version,
+                "status": rollout.status,
+                "wave": rollout.wave,
+                "waves": [float(fraction) for fraction in rollout.waves.split(",")],
+                "devices": counts,
+            }
+
+    async def resume(self, rollout_id: int):
+        async with AsyncSessionLocal() as db:
+            state = await self._lock(db)
+            rollout = await self._get(db, rollout_id)
+            if rollout.status != "paused":
+                raise RolloutError(f"Rollout {rollout_id} is {rollout.status}, not paused")
+            rollout.status = "active"
+            await self._advance(db, state, rollout, force=True)
+            await db.commit()
+        await self.dispatch()
+
+    async def cancel(self, rollout_id: int):
+        async with AsyncSessionLocal() as db:
+            await self._lock(db)
+            rollout = await self._get(db, rollout_id)
+            if rollout.status in OPEN_ROLLOUT:
+                rollout.status = "cancelled"
+                await db.execute(
+                    update(OtaTarget)
+                    .where(OtaTarget.rollout_id == rollout_id, OtaTarget.state.in_((WAITING, QUEUED, DOWNLOADING)))
+                    .values(state=FAILED, lease_expires_at=None)
+                )
+            await db.commit()
+        await self.dispatch()
+
+    async def report(self, device_id: str, success: bool):
+        """Record the outcome of a device's download; raises ``KeyError`` without a lease."""
+        async with AsyncSessionLocal() as db:
+            state = await self._lock(db)
+            target = await db.scalar(
+                select(OtaTarget).where(OtaTarget.device_id == device_id, OtaTarget.state == DOWNLOADING)
+            )
+            if target is None:
+                raise KeyError(device_id)
+            await self._finish(db, state, target, success)
+            await db.commit()
+        await self.dispatch()
+
+    def assignment_for(self, device_id: str) -> Optional[Assignment]:
+        assignment = self.assignments.get(device_id)
+        if assignment is not None and assignment.expires_at > self.clock():
+            return assignment
+        return None
+
+    async def wait_for(self, device_id: str, timeout: float) -> Optional[Assignment]:
+        """The device's assignment, waiting up to ``timeout`` seconds for one."""
+        assignment = self.assignment_for(device_id)
+        if assignment is not None or timeout <= 0:
+            return assignment
+        event = self._waiters.setdefault(device_id, asyncio.Event())
+        self._waiting[device_id] = self._waiting.get(device_id, 0) + 1
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            # Concurrent polls for one device share the event; the last one out removes it
+            self._waiting[device_id] -= 1
+            if not self._waiting[device_id]:
+                del self._waiting[device_id]
+                if self._waiters.get(device_id) is event:
+                    del self._waiters[device_id]
+        return self.assignment_for(device_id)
+
+    async def dispatch(self):
+        """Expire stale leases, grant queued devices while the caps allow, then refresh the cache."""
+        async with AsyncSessionLocal() as db:
+            state = await self._lock(db)
+            now = self.clock()
+            expired = (await db.scalars(
+                select(OtaTarget).where(OtaTarget.state == DOWNLOADING, OtaTarget.lease_expires_at <= now)
+            )).all()
+            for target in expired:
+                logger.info("OTA lease for %s in rollout %d expired", target.device_id, target.rollout_id)
+                await self._finish(db, state, target, False)
+            await db.flush()
+
+            active = await db.scalar(select(func.count()).select_from(OtaTarget).where(OtaTarget.state == DOWNLOADING))
+            free = self.max_active - active
+            if free > 0:
+                rate = self.egress_bytes_per_sec
+                if rate > 0:
+                    # One second of egress as burst, so idle time does not bank a stampede
+                    state.egress_tokens = min(rate, state.egress_tokens + (now - state.refilled_at) * rate)
+                    state.refilled_at = now
+                candidates = await db.execute(
+                    select(OtaTarget.rollout_id, OtaTarget.device_id, OtaRollout.size)
+                    .join(OtaRollout, OtaRollout.id == OtaTarget.rollout_id)
+                    .where(OtaTarget.state == QUEUED, OtaRollout.status == "active")
+                    .order_by(OtaTarget.release_seq, OtaTarget.rank)
+                    .limit(free)
+                )
+                grants = []
+                for rollout_id, device_id, size in candidates:
+                    if rate > 0:
+                        # Charged up front; the bucket may go into debt for an image larger than the burst
+                        if state.egress_tokens <= 0:
+                            break
+                        state.egress_tokens -= size
+                    grants.append({
+                        "rollout_id": rollout_id,
+                        "device_id": device_id,
+                        "state": DOWNLOADING,
+                        "attempts": OtaTarget.attempts + 1,
+                        "lease_expires_at": now + self.lease_seconds,
+                    })
+                for grant in grants:
+                    await db.execute(
+                        update(OtaTarget)
+                        .where(OtaTarget.rollout_id == grant.pop("rollout_id"), OtaTarget.device_id == grant.pop("device_id"))
+                        .values(**grant)
+                    )
+                OTA_GRANTED.labels().inc(len(grants))
+            await db.commit()
+        await self.refresh()
+
+    async def refresh(self):
+        """Reload this worker's assignment cache and wake pollers that now have one."""
+        async with AsyncSessionLocal() as db:
+            use_primary(db)
+            rows = await db.execute(
+                select(OtaTarget.device_id, OtaTarget.rollout_id, OtaRollout.sha256, OtaRollout.version,
+                       OtaRollout.size, OtaTarget.lease_expires_at)
+                .join(OtaRollout, OtaRollout.id == OtaTarget.rollout_id)
+                .where(OtaTarget.state == DOWNLOADING)
+            )
+            self.assignments = {device_id: Assignment(*fields) for device_id, *fields in rows}
+        for device_id in self.assignments.keys() & self._waiters.keys():
+            self._waiters.pop(device_id).set()
+
+    async def _lock(self, db: AsyncSession) -> OtaSchedulerState:
+        """Take the scheduler lock for this transaction and return the shared state row."""
+        use_primary(db)
+        result = await db.execute(
+            update(OtaSchedulerState).where(OtaSchedulerState.id == 1).values(release_seq=OtaSchedulerState.release_seq)
+        )
+        if not result.rowcount:
+            try:
+                async with db.begin_nested():
+                    db.add(OtaSchedulerState(id=1, egress_tokens=self.egress_bytes_per_sec, refilled_at=self.clock(), release_seq=0))
+            except IntegrityError:
+                # Another worker created it first
+                pass
+        return await db.get(OtaSchedulerState, 1, populate_existing=True, with_for_update=True)
+
+    async def _get(self, db: AsyncSession, rollout_id: int) -> OtaRollout:
+        rollout = await db.get(OtaRollout, rollout_id)
+        if rollout is None:
+            raise KeyError(rollout_id)
+        return rollout
+
+    async def _finish(self, db: AsyncSession, state: OtaSchedulerState, target: OtaTarget, success: bool):
+        target.lease_expires_at = None
+        if success:
+            target.state = COMPLETED
+        elif target.attempts < self.max_attempts:
+            target.state = QUEUED
+            return
+        else:
+            target.state = FAILED
+        await db.flush()
+        await self._advance(db, state, await self._get(db, target.rollout_id))
+
+    async def _advance(self, db: AsyncSession, state: OtaSchedulerState, rollout: OtaRollout, force: bool = False):
+        """Release the next wave once the current one has finished cleanly."""
+        wave_count = len(rollout.waves.split(","))
+        while rollout.status == "active":
+            if rollout.wave >= 0:
+                counts = dict((await db.execute(
+                    select(OtaTarget.state, func.count())
+                    .where(OtaTarget.rollout_id == rollout.id, OtaTarget.wave == rollout.wave)
+                    .group_by(OtaTarget.state)
+                )).all())
+                if counts.get(QUEUED) or counts.get(DOWNLOADING):
+                    return
+                failed, members = counts.get(FAILED, 0), sum(counts.values())
+                if not force and failed > self.max_failure_ratio * members:
+                    rollout.status = "paused"
+                    logger.warning("OTA rollout %d paused: %d of %d devices failed in wave %d",
+                                   rollout.id, failed, members, rollout.wave)
+                    return
+                force = False
+                if rollout.wave == wave_count - 1:
+                    rollout.status = "completed"
+                    return
+            rollout.wave += 1
+            state.release_seq += 1
+            await db.execute(
+                update(OtaTarget)
+                .where(OtaTarget.rollout_id == rollout.id, OtaTarget.wave == rollout.wave)
+                .values(state=QUEUED, release_seq=state.release_seq)
+            )
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        # Refills the egress bucket, reclaims expired leases and picks up other workers' grants
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            try:
+                await self.dispatch()
+            except Exception:
+                logger.exception("OTA dispatch failed")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+rollout_scheduler = RolloutScheduler(
+    max_active=settings.OTA_MAX_ACTIVE_DOWNLOADS,
+    egress_bytes_per_sec=settings.OTA_EGRESS_BYTES_PER_SEC,
+    lease_seconds=settings.OTA_LEASE_SECONDS,
+    max_attempts=settings.OTA_MAX_ATTEMPTS,
+    max_failure_ratio=settings.OTA_MAX_FAILURE_RATIO,
+    tick_interval=settings.OTA_TICK_INTERVAL,
+)
+
+OTA_GRANTED = registry.counter("ota_downloads_granted_total", "Firmware downloads handed out by the OTA scheduler.")
+registry.callback_gauge(
+    "ota_active_downloads", "OTA leases currently held by devices, as last seen by this worker.",
+    lambda: len(rollout_scheduler.assignments))
@@ -0,0 +1,135 @@
+import threading
+from typing import Dict, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.routing import use_primary
+from app.models.user import Role, Resource, Permission, RoleResourcePermission
+from app.services.cache_versions import bump_shared, cache_version_watcher
+
+RBAC_MODELS = (Role, Resource, Permission, RoleResourcePermission)
+# Name of the shared counter other workers watch for RBAC changes
+SHARED_VERSION = "rbac"
+
+Key = Union[int, str]
+
+
+class PermissionMatrix:
+    """Roles x resources x permissions compiled into one integer bitset per role.
+
+    Bit ``resource_index * permission_count + permission_index`` is set when the
+    role holds that permission on that resource. Resources and permissions can
+    be addressed either by id or by name.
+    """
+
+    def __init__(self, version: int, resources, permissions, grants):
+        self.version = version
+        self._resource_index: Dict[Key, int] = {}
+        self._permission_index: Dict[Key, int] = {}
+        for idx, (res_id, res_name) in enumerate(resources):
+            self._resource_index[res_id] = idx
+            self._resource_index[res_name] = idx
+        for idx, (perm_id, perm_name) in enumerate(permissions):
+            self._permission_index[perm_id] = idx
+            self._permission_index[perm_name] = idx
+        self._permission_count = len(permissions)
+        self._roles: Dict[int, int] = {}
+        for role_id, res_id, perm_id in grants:
+            bit = self.bit(res_id, perm_id)
+            if bit is not None:
+                self._roles[role_id] = self._roles.get(role_id, 0) | bit
+
+    @classmethod
+    def build(cls, db: Session, version: int) -> "PermissionMatrix":
+        resources = db.query(Resource.id, Resource.name).order_by(Resource.id).all()
+        permissions = db.query(Permission.id, Permission.name).order_by(Permission.id).all()
+        grants = db.query(
+            RoleResourcePermission.role_id,
+            RoleResourcePermission.resource_id,
+            RoleResourcePermission.permission_id,
+        ).all()
+        return cls(version, resources, permissions, grants)
+
+    def bit(self, resource: Key, permission: Key) -> Optional[int]:
+        res_idx = self._resource_index.get(resource)
+        perm_idx = self._permission_index.get(permission)
+        if res_idx is None or perm_idx is None:
+            return None
+        return 1 << (res_idx * self._permission_count + perm_idx)
+
+    def role_bits(self, role_id: Optional[int]) -> int:
+        if role_id is None:
+            return 0
+        return self._roles.get(role_id, 0)
+
+    def has_permission(self, role_id: Optional[int], resource: Key, permission: Key) -> bool:
+        bit = self.bit(resource, permission)
+        if bit is None:
+            return False
+        return bool(self.role_bits(role_id) & bit)
+
+
+_lock = threading.Lock()
+_version = 0
+_matrix: Optional[PermissionMatrix] = None
+
+
+def current_version() -> int:
+    return _version
+
+
+def bump_version() -> int:
+    """Mark this process's compiled matrix stale; the next lookup rebuilds it.
+
+    Other processes learn of the change through the shared ``rbac`` counter,
+    which the flush listener below (or ``bump_shared`` after Core writes)
+    increments in the writing transaction.
+    """
+    global _version
+    with _lock:
+        _version += 1
+        return _version
+
+
+async def get_permission_matrix(db: AsyncSession) -> PermissionMatrix:
+    global _matrix
+    matrix = _matrix
+    if matrix is not None and matrix.version == _version:
+        return matrix
+    # A bump that lands while the build is running leaves the result stale, so the
+    # next lookup rebuilds; concurrent rebuilds are harmless and need no lock.
+    # Rebuilds follow RBAC writes, so read them from the primary, not a lagging replica.
+    use_primary(db)
+    matrix = await db.run_sync(PermissionMatrix.build, _version)
+    _matrix = matrix
+    return matrix
+
+
+async def has_permission(db: AsyncSession, role_id: Optional[int], resource: Key, permission: Key) -> bool:
+    return (await get_permission_matrix(db)).has_permission(role_id, resource, permission)
+
+
+cache_version_watcher.watch(SHARED_VERSION, bump_version)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_rbac_writes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, RBAC_MODELS):
+            if not session.info.get("rbac_dirty"):
+                bump_shared(session, SHARED_VERSION)
+            session.info["rbac_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    if session.info.pop("rbac_dirty", False):
+        bump_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("rbac_dirty", None)
@@ -0,0 +1,57 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import Module, Permission, Resource, RoleResourcePermission
+
+
+class RBACService:
+    @staticmethod
+    async def get_role_permissions(db: AsyncSession, role_id: int) -> List[dict]:
+        result = await db.execute(
+            select(Resource.name, Permission.name)
+            .select_from(RoleResourcePermission)
+            .join(Resource, RoleResourcePermission.resource_id == Resource.id)
+            .join(Permission, RoleResourcePermission.permission_id == Permission.id)
+            .where(RoleResourcePermission.role_id == role_id)
+            .order_by(RoleResourcePermission.id)
+        )
+        return [{"resource": resource, "permission": permission} for resource, permission in result.all()]
+
+    @staticmethod
+    async def get_permissions_for_roles(db: AsyncSession, role_ids: Iterable[int]) -> Dict[int, Dict[str, Dict[str, List[str]]]]:
+        """Return ``{role_id: {module: {resource: [permission, ...]}}}`` in one query."""
+        role_ids = list(dict.fromkeys(role_ids))
+        result: Dict[int, Dict[str, Dict[str, List[str]]]] = {
+            role_id: defaultdict(lambda: defaultdict(list)) for role_id in role_ids
+        }
+        if not role_ids:
+            return {}
+        rows = await db.execute(
+            select(RoleResourcePermission.role_id, Module.name, Resource.name, Permission.name)
+            .join(Resource, RoleResourcePermission.resource_id == Resource.id)
+            .join(Permission, RoleResourcePermission.permission_id == Permission.id)
+            .outerjoin(Module, Resource.module_id == Module.id)
+            .where(RoleResourcePermission.role_id.in_(role_ids))
+            .order_by(RoleResourcePermission.role_id, RoleResourcePermission.id)
+        )
+        for role_id, module, resource, permission in rows.all():
+            result[role_id][module or "ungrouped"][resource].append(permission)
+        return {
+            role_id: {module: dict(resources) for module, resources in modules.items()}
+            for role_id, modules in result.items()
+        }
+
+    @staticmethod
+    async def get_roles_with_permission(db: AsyncSession, resource: str, permission: str) -> List[int]:
+        """Ids of the roles that hold ``permission`` on ``resource``."""
+        result = await db.execute(
+            select(RoleResourcePermission.role_id)
+            .join(Resource, RoleResourcePermission.resource_id == Resource.id)
+            .join(Permission, RoleResourcePermission.permission_id == Permission.id)
+            .where(Resource.name == resource, Permission.name == permission)
+            .order_by(RoleResourcePermission.role_id)
+        )
+        return list(result.scalars().all())
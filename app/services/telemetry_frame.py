@@ -0,0 +1,161 @@
+"""Binary telemetry frames for metered (LTE) links.
+
+Layout, all integers little-endian::
+
+    header    4s  magic b"TLMF"
+              B   version (1)
+              B   compression: 0 none, 1 deflate (zlib), 2 zstd
+              H   device id length in bytes
+              I   reading count
+    device    device id, UTF-8
+    metrics   B metric count, then per metric: B length + UTF-8 name
+    readings  count x 13-byte records, compressed as a whole when flagged:
+              q ts_ms, B metric index, f value (float32)
+
+A reading costs 13 bytes before compression, against ~70 as JSON.
+Decoding maps the records onto a NumPy structured array without copying
+and validates them column-wise. ``frame_readings`` then converts them to
+the ingestor's row tuples, one tuple per reading, so a frame is limited to
+``TELEMETRY_FRAME_MAX_READINGS`` readings, checked before decompressing.
+"""
+import struct
+import zlib
+from itertools import repeat
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.telemetry_ingest import Reading
+
+FRAME_MAGIC = b"TLMF"
+FRAME_VERSION = 1
+CONTENT_TYPE = "application/x-telemetry-frame"
+
+COMPRESSION_NONE = 0
+COMPRESSION_DEFLATE = 1
+COMPRESSION_ZSTD = 2
+
+HEADER = struct.Struct("<4sBBHI")
+RECORD = np.dtype([("ts_ms", "<i8"), ("metric", "u1"), ("value", "<f4")])
+
+
+class FrameError(ValueError):
+    """The body is not a valid telemetry frame."""
+
+
+class Frame(NamedTuple):
+    device_id: str
+    metrics: List[str]
+    records: np.ndarray
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def _decompress(method: int, payload: memoryview, expected: int) -> bytes:
+    if method == COMPRESSION_NONE:
+        return payload
+    if method == COMPRESSION_DEFLATE:
+        decompressor = zlib.decompressobj()
+        try:
+            data = decompressor.decompress(payload, expected + 1)
+        except zlib.error as exc:
+            raise FrameError(f"Corrupt deflate payload: {exc}") from exc
+        return data
+    if method == COMPRESSION_ZSTD:
+        zstandard = _zstd()
+        if zstandard is None:
+            raise FrameError("zstd frames are not supported by this server; use deflate")
+        try:
+            return zstandard.ZstdDecompressor().decompress(bytes(payload), max_output_size=expected + 1)
+        except zstandard.ZstdError as exc:
+            raise FrameError(f"Corrupt zstd payload: {exc}") from exc
+    raise FrameError(f"Unknown compression {method}")
+
+
+def decode_frame(body: bytes, max_readings: Optional[int] = None) -> Frame:
+    if max_readings is None:
+        max_readings = settings.TELEMETRY_FRAME_MAX_READINGS
+    view = memoryview(body)
+    if len(view) < HEADER.size:
+        raise FrameError("Frame shorter than its header")
+    magic, version, compression, device_len, count = HEADER.unpack_from(view)
+    if magic != FRAME_MAGIC:
+        raise FrameError("Not a telemetry frame")
+    if version != FRAME_VERSION:
+        raise FrameError(f"Unsupported frame version {version}")
+    if count > max_readings:
+        raise FrameError(f"Frame declares {count} readings; at most {max_readings} are accepted")
+    offset = HEADER.size
+    try:
+        device_id = bytes(view[offset:offset + device_len]).decode()
+        offset += device_len
+        (metric_count,) = struct.unpack_from("<B", view, offset)
+        offset += 1
+        metrics = []
+        for _ in range(metric_count):
+            (length,) = struct.unpack_from("<B", view, offset)
+            metrics.append(bytes(view[offset + 1:offset + 1 + length]).decode())
+            offset += 1 + length
+    except (struct.error, UnicodeDecodeError) as exc:
+        raise FrameError(f"Truncated or malformed frame: {exc}") from exc
+    if not device_id or not metrics:
+        raise FrameError("Frame needs a device id and at least one metric")
+
+    expected = count * RECORD.itemsize
+    payload = _decompress(compression, view[offset:], expected)
+    if len(payload) != expected:
+        raise FrameError(f"Expected {count} readings ({expected} bytes), got {len(payload)} bytes")
+    records = np.frombuffer(payload, dtype=RECORD, count=count)
+    if count and int(records["metric"].max()) >= len(metrics):
+        raise FrameError("Reading refers to an undefined metric")
+    if not np.isfinite(records["value"]).all():
+        raise FrameError("Readings must be finite numbers")
+    return Frame(device_id, metrics, records)
+
+
+def frame_readings(frame: Frame) -> List[Reading]:
+    """Buffer rows for the ingestor: columns are converted by NumPy, then zipped into one tuple per reading."""
+    names = np.array(frame.metrics, dtype=object)[frame.records["metric"]]
+    return list(zip(
+        repeat(frame.device_id),
+        names.tolist(),
+        frame.records["ts_ms"].tolist(),
+        frame.records["value"].astype(np.float64).tolist(),
+    ))
+
+
+def encode_frame(
+    device_id: str,
+    metrics: Sequence[str],
+    ts_ms: Sequence[int],
+    metric_index: Sequence[int],
+    values: Sequence[float],
+    compression: int = COMPRESSION_NONE,
+) -> bytes:
+    """Build a frame, as a device would; used by tests, benchmarks and device simulators."""
+    records = np.empty(len(ts_ms), dtype=RECORD)
+    records["ts_ms"] = ts_ms
+    records["metric"] = metric_index
+    records["value"] = values
+    payload = records.tobytes()
+    if compression == COMPRESSION_DEFLATE:
+        payload = zlib.compress(payload, 9)
+    elif compression == COMPRESSION_ZSTD:
+        zstandard = _zstd()
+        if zstandard is None:
+            raise FrameError("zstandard is not installed")
+        payload = zstandard.ZstdCompressor(level=19).compress(payload)
+    device = device_id.encode()
+    parts = [HEADER.pack(FRAME_MAGIC, FRAME_VERSION, compression, len(device), len(records)), device, bytes([len(metrics)])]
+    for metric in metrics:
+        name = metric.encode()
+        parts += [bytes([len(name)]), name]
+    parts.append(payload)
+    return b"".join(parts)
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import AsyncSessionLocal
+from app.models.telemetry import TelemetryReading
+
+logger = logging.getLogger(__name__)
+
+# (device_id, metric, ts_ms, value)
+Reading = Tuple[str, str, int, float]
+
+
+class RingBuffer:
+    """Fixed-capacity FIFO of readings; a batch is admitted whole or not at all.
+
+    Not thread-safe; used from the event loop only.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._slots: List[Optional[Reading]] = [None] * capacity
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def offer(self, readings: Sequence[Reading]) -> bool:
+        if self._size + len(readings) > self.capacity:
+            return False
+        tail = (self._head + self._size) % self.capacity
+        first = min(len(readings), self.capacity - tail)
+        self._slots[tail:tail + first] = readings[:first]
+        self._slots[:len(readings) - first] = readings[first:]
+        self._size += len(readings)
+        return True
+
+    def drain(self, limit: int) -> List[Reading]:
+        count = min(limit, self._size)
+        end = self._head + count
+        if end <= self.capacity:
+            readings = self._slots[self._head:end]
+            self._slots[self._head:end] = [None] * count
+        else:
+            end -= self.capacity
+            readings = self._slots[self._head:] + self._slots[:end]
+            self._slots[self._head:] = [None] * (self.capacity - self._head)
+            self._slots[:end] = [None] * end
+        self._head = end % self.capacity
+        self._size -= count
+        return readings
+
+
+class TelemetryIngestor:
+    """Buffers readings in memory and writes them with bulk inserts from a background task.
+
+    The task flushes when ``flush_rows`` readings are waiting or every
+    ``flush_interval`` seconds, whichever comes first. ``submit`` refuses a
+    batch that does not fit, which the API reports as 429. A batch whose
+    insert fails is retried on the next flush, except that one the database
+    rejects as invalid is split in halves until the offending readings are
+    isolated and dropped, so a bad reading cannot wedge ingestion.
+    """
+
+    def __init__(self, capacity: int, flush_rows: int, flush_interval: float):
+        self.buffer = RingBuffer(capacity)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        # Batches still to write, last one first; kept across failed flushes
+        self._retry: List[List[Reading]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, readings: Sequence[Reading]) -> bool:
+        if not self.buffer.offer(readings):
+            TELEMETRY_REJECTED.labels().inc(len(readings))
+            return False
+        if self._wakeup is not None and len(self.buffer) >= self.flush_rows:
+            self._wakeup.set()
+        return True
+
+    async def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Telemetry flush failed; %d readings will be retried", self.retrying)
+
+    async def flush(self) -> int:
+        """Write everything buffered so far in batches of ``flush_rows``; returns the rows written."""
+        written = 0
+        while self._retry or len(self.buffer):
+            if not self._retry:
+                self._retry = [self.buffer.drain(self.flush_rows)]
+            batch = self._retry[-1]
+            try:
+                await self._write(batch)
+            except (IntegrityError, DataError) as exc:
+                self._retry.pop()
+                if len(batch) == 1:
+                    logger.warning("Dropping telemetry reading %r rejected by the database: %s", batch[0], exc.orig)
+                    TELEMETRY_DROPPED.labels().inc()
+                else:
+                    middle = len(batch) // 2
+                    self._retry += [batch[middle:], batch[:middle]]
+                continue
+            self._retry.pop()
+            written += len(batch)
+        return written
+
+    @property
+    def retrying(self) -> int:
+        return sum(len(batch) for batch in self._retry)
+
+    async def _write(self, readings: List[Reading]):
+        rows = [
+            {"device_id": device_id, "metric": metric, "ts_ms": ts_ms, "value": value}
+            for device_id, metric, ts_ms, value in readings
+        ]
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(TelemetryReading.__table__), rows)
+            await db.commit()
+        TELEMETRY_WRITTEN.labels().inc(len(rows))
+
+    async def stop(self):
+        """Stop the background task and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final telemetry flush failed; %d readings lost", self.retrying + len(self.buffer))
+
+
+telemetry_ingestor = TelemetryIngestor(
+    capacity=settings.TELEMETRY_BUFFER_CAPACITY,
+    flush_rows=settings.TELEMETRY_FLUSH_ROWS,
+    flush_interval=settings.TELEMETRY_FLUSH_INTERVAL,
+)
+
+TELEMETRY_WRITTEN = registry.counter(
+    "telemetry_readings_written_total", "Telemetry readings written to the database.")
+TELEMETRY_DROPPED = registry.counter(
+    "telemetry_readings_dropped_total", "Telemetry readings the database rejected as invalid.")
+TELEMETRY_REJECTED = registry.counter(
+    "telemetry_readings_rejected_total", "Telemetry readings refused because the ingest buffer was full.")
+registry.callback_gauge(
+    "telemetry_buffer_readings", "Telemetry readings waiting to be written.", lambda: len(telemetry_ingestor.buffer))
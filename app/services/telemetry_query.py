@@ -0,0 +1,140 @@
+import time
+from typing import Dict, Literal, Optional, Tuple
+
+import numpy as np
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.telemetry import TelemetryReading
+
+Method = Literal["minmax", "lttb"]
+
+
+async def fetch_series(
+    db: AsyncSession, device_id: str, metric: str, start_ms: int, end_ms: int, chunk_size: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Timestamps and values in ``[start_ms, end_ms)`` as two arrays, read ``chunk_size`` rows at a time."""
+    stmt = (
+        select(TelemetryReading.ts_ms, TelemetryReading.value)
+        .where(
+            TelemetryReading.device_id == device_id,
+            TelemetryReading.metric == metric,
+            TelemetryReading.ts_ms >= start_ms,
+            TelemetryReading.ts_ms < end_ms,
+        )
+        .order_by(TelemetryReading.ts_ms)
+        .execution_options(yield_per=chunk_size)
+    )
+    ts_chunks, value_chunks = [], []
+    result = await db.stream(stmt)
+    async for partition in result.partitions():
+        chunk = np.array(partition, dtype=np.float64).reshape(-1, 2)
+        ts_chunks.append(chunk[:, 0].astype(np.int64))
+        value_chunks.append(chunk[:, 1])
+    if not ts_chunks:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    return np.concatenate(ts_chunks), np.concatenate(value_chunks)
+
+
+def bucket_aggregate(ts: np.ndarray, values: np.ndarray, start_ms: int, end_ms: int, points: int) -> Dict[str, np.ndarray]:
+    """min/max/mean/last per equal-width time bucket; empty buckets are omitted.
+
+    ``ts`` must be sorted. ``ts_ms`` in the result is each bucket's start.
+    """
+    if not len(ts):
+        empty = np.empty(0)
+        return {"ts_ms": empty.astype(np.int64), "min": empty, "max": empty, "mean": empty, "last": empty,
+                "count": empty.astype(np.int64)}
+    width = max(1, -(-(end_ms - start_ms) // points))
+    buckets = (ts - start_ms) // width
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.concatenate((starts[1:], [len(ts)]))
+    counts = ends - starts
+    return {
+        "ts_ms": start_ms + buckets[starts] * width,
+        "min": np.minimum.reduceat(values, starts),
+        "max": np.maximum.reduceat(values, starts),
+        "mean": np.add.reduceat(values, starts) / counts,
+        "last": values[ends - 1],
+        "count": counts,
+    }
+
+
+def lttb(ts: np.ndarray, values: np.ndarray, points: int) -> Dict[str, np.ndarray]:
+    """Largest-Triangle-Three-Buckets: ``points`` raw samples that keep the series' visual shape."""
+    n = len(ts)
+    if points >= n or points < 3:
+        return {"ts_ms": ts, "value": values}
+    x = ts.astype(np.float64)
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[next_lo:next_hi].mean(), values[next_lo:next_hi].mean()
+        px, py = x[previous], values[previous]
+        areas = np.abs((px - avg_x) * (values[lo:hi] - py) - (px - x[lo:hi]) * (avg_y - py))
+        previous = lo + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return {"ts_ms": ts[selected], "value": values[selected]}
+
+
+class SeriesCache:
+    """Serialized series responses in a bounded LRU.
+
+    Ranges that reach into the last ``recent_window_ms`` can still gain
+    readings, so they expire after ``recent_ttl``; older ranges keep ``ttl``.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, recent_ttl: float, recent_window_ms: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.recent_ttl = recent_ttl
+        self.recent_window_ms = recent_window_ms
+
+    def get(self, key) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    def set(self, key, body: bytes, end_ms: int):
+        recent = end_ms > time.time() * 1000 - self.recent_window_ms
+        self._cache.set(key, body, ttl=self.recent_ttl if recent else None)
+
+    def clear(self):
+        self._cache.clear()
+
+
+series_cache = SeriesCache(
+    maxsize=settings.TELEMETRY_SERIES_CACHE_SIZE,
+    ttl=settings.TELEMETRY_SERIES_CACHE_TTL,
+    recent_ttl=settings.TELEMETRY_SERIES_RECENT_TTL,
+    recent_window_ms=int(settings.TELEMETRY_FLUSH_INTERVAL * 1000) + 60_000,
+)
+
+
+async def downsampled_series(
+    db: AsyncSession, device_id: str, metric: str, start_ms: int, end_ms: int, points: int, method: Method
+) -> bytes:
+    """JSON body of the downsampled series, from the cache when the same range was asked for recently."""
+    key = (device_id, metric, start_ms, end_ms, points, method)
+    body = series_cache.get(key)
+    if body is not None:
+        return body
+    ts, values = await fetch_series(db, device_id, metric, start_ms, end_ms, settings.TELEMETRY_QUERY_CHUNK_SIZE)
+    series = lttb(ts, values, points) if method == "lttb" else bucket_aggregate(ts, values, start_ms, end_ms, points)
+    payload = {
+        "device_id": device_id,
+        "metric": metric,
+        "start_ms": start_ms,
+        "end_ms": end_ms,
+        "method": method,
+        "raw_points": len(ts),
+        **series,
+    }
+    body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    series_cache.set(key, body, end_ms)
+    return body
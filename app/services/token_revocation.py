@@ -0,0 +1,141 @@
+import heapq
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.token import RevokedToken
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over a bytearray using double hashing.
+
+    Positions come from the built-in (per-process salted) string hash, which
+    is cached on the string, so probing allocates nothing. The filter is
+    never persisted, so the salt does not matter.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray((num_bits + 7) // 8)
+        self.count = 0
+
+    def add(self, key: str):
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % self.num_bits
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        bits = self.bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % self.num_bits
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+class RevocationStore:
+    """Revoked refresh-token ids that expire along with the tokens themselves.
+
+    Lookups for tokens that were never revoked stop at the Bloom filter. The
+    filter is rebuilt from the live entries once enough of them have expired,
+    so memory tracks the number of unexpired revocations.
+    """
+
+    def __init__(self, bloom_bits: int, bloom_hashes: int, prune_interval: float):
+        self.bloom_bits = bloom_bits
+        self.bloom_hashes = bloom_hashes
+        self.prune_interval = prune_interval
+        self._expiry: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._bloom = BloomFilter(bloom_bits, bloom_hashes)
+        self._expired_since_rebuild = 0
+        self._last_db_prune = 0.0
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def is_revoked(self, jti: str) -> bool:
+        if jti not in self._bloom:
+            return False
+        expires_at = self._expiry.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def mark_revoked(self, jti: str, expires_at: float) -> bool:
+        """Record a revocation in memory; returns False if it was already revoked."""
+        if self.is_revoked(jti):
+            return False
+        self._expiry[jti] = expires_at
+        heapq.heappush(self._heap, (expires_at, jti))
+        self._bloom.add(jti)
+        self.purge()
+        return True
+
+    def purge(self, now: float = None):
+        now = time.time() if now is None else now
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, jti = heapq.heappop(heap)
+            if self._expiry.get(jti, now + 1) <= now:
+                del self._expiry[jti]
+                self._expired_since_rebuild += 1
+        if self._expired_since_rebuild and self._expired_since_rebuild * 2 >= self._bloom.count:
+            self._rebuild_bloom()
+
+    def _rebuild_bloom(self):
+        bloom = BloomFilter(self.bloom_bits, self.bloom_hashes)
+        for jti in self._expiry:
+            bloom.add(jti)
+        self._bloom = bloom
+        self._expired_since_rebuild = 0
+
+    async def revoke(self, db: AsyncSession, jti: str, expires_at: float) -> bool:
+        """Persist a revocation; returns False if the token was already revoked.
+
+        The DB row is the source of truth: memory is only updated once the
+        commit succeeds, and a primary-key conflict means another worker
+        rotated the same token first.
+        """
+        if self.is_revoked(jti):
+            return False
+        db.add(RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(expires_at)))
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            self.mark_revoked(jti, expires_at)
+            return False
+        if not self.mark_revoked(jti, expires_at):
+            # A concurrent request in this process won the race while we were committing
+            return False
+        if time.monotonic() - self._last_db_prune >= self.prune_interval:
+            self._last_db_prune = time.monotonic()
+            await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+            await db.commit()
+        return True
+
+    async def load(self, db: AsyncSession):
+        """Restore unexpired revocations persisted by earlier processes."""
+        now = datetime.utcnow()
+        await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        await db.commit()
+        result = await db.stream(select(RevokedToken.jti, RevokedToken.expires_at))
+        async for jti, expires_at in result:
+            self.mark_revoked(jti, (expires_at - datetime(1970, 1, 1)).total_seconds())
+
+
+revocation_store = RevocationStore(
+    bloom_bits=settings.REVOCATION_BLOOM_BITS,
+    bloom_hashes=settings.REVOCATION_BLOOM_HASHES,
+    prune_interval=settings.REVOCATION_PRUNE_INTERVAL,
+)
@@ -0,0 +1,196 @@
+import csv
+import json
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.hashing import HasherSaturated, password_hasher
+from app.models.user import Role, User
+from app.schemas.user import UserCreate
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering the whole body."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8").rstrip("\r")
+
+
+class _LineFeed:
+    """Sync iterator handed to one ``csv.reader``; only read once a full record is queued."""
+
+    def __init__(self):
+        self.lines: Deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        return self.lines.popleft()
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[List[str]]:
+    """Parse CSV with a single reader, holding lines back until their quotes balance.
+
+    Quoted fields may span physical lines; the reader is only advanced once
+    the queued lines contain an even number of quote characters, so it never
+    runs out of input in the middle of a record.
+    """
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    open_quotes = 0
+    async for line in lines:
+        if not open_quotes and not line.strip():
+            continue
+        feed.lines.append(line + "\n")
+        open_quotes = (open_quotes + line.count('"')) % 2
+        if not open_quotes:
+            yield next(reader)
+    if open_quotes:
+        raise csv.Error("unexpected end of data inside a quoted field")
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[Tuple[int, object]]:
+    """Yield ``(row_number, dict or error message)`` for NDJSON or CSV input."""
+    row_number = 0
+    if fmt == "csv":
+        header = None
+        rows = iter_csv_rows(lines)
+        while True:
+            try:
+                values = await rows.__anext__()
+            except StopAsyncIteration:
+                return
+            except csv.Error as exc:
+                yield row_number + 1, f"Malformed row: {exc}"
+                return
+            if header is None:
+                header = values
+                continue
+            row_number += 1
+            yield row_number, {key: value for key, value in zip(header, values) if value != ""}
+    else:
+        async for line in lines:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                yield row_number, json.loads(line)
+            except ValueError as exc:
+                yield row_number, f"Malformed row: {exc}"
+
+
+class UserImporter:
+    """Validates, hashes and inserts users chunk by chunk, yielding a result per row.
+
+    Rows rejected before insertion are reported as soon as they are read, and
+    the rest once their chunk is written, so results are not in input order;
+    match them to the input by ``row``. Hashing a chunk occupies at most
+    ``hash_workers`` of the password hashing pool.
+    """
+
+    def __init__(self, db: AsyncSession, chunk_size: int, hash_workers: Optional[int] = None):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.hash_workers = hash_workers
+
+    async def run(self, records: AsyncIterator[Tuple[int, object]]) -> AsyncIterator[dict]:
+        chunk: List[Tuple[int, UserCreate]] = []
+        async for row_number, record in records:
+            if isinstance(record, str):
+                yield {"row": row_number, "status": "error", "error": record}
+                continue
+            try:
+                chunk.append((row_number, UserCreate.model_validate(record)))
+            except ValidationError as exc:
+                yield {"row": row_number, "status": "error", "error": _format_validation_error(exc)}
+                continue
+            if len(chunk) >= self.chunk_size:
+                for result in await self._import_chunk(chunk):
+                    yield result
+                chunk = []
+        if chunk:
+            for result in await self._import_chunk(chunk):
+                yield result
+
+    async def _import_chunk(self, chunk: List[Tuple[int, UserCreate]]) -> List[dict]:
+        results: Dict[int, dict] = {}
+        emails = [user_in.email for _, user_in in chunk]
+        usernames = [user_in.username for _, user_in in chunk]
+        existing = await self.db.execute(
+            select(User.email, User.username).where(or_(User.email.in_(emails), User.username.in_(usernames)))
+        )
+        taken_emails = set()
+        taken_usernames = set()
+        for email, username in existing.all():
+            taken_emails.add(email)
+            taken_usernames.add(username)
+        role_ids = {user_in.role_id for _, user_in in chunk if user_in.role_id is not None}
+        known_roles = set()
+        if role_ids:
+            known_roles = set((await self.db.scalars(select(Role.id).where(Role.id.in_(role_ids)))).all())
+
+        accepted: List[Tuple[int, UserCreate]] = []
+        for row_number, user_in in chunk:
+            if user_in.role_id is not None and user_in.role_id not in known_roles:
+                results[row_number] = {"row": row_number, "status": "error", "error": "Unknown role"}
+            elif user_in.email in taken_emails:
+                results[row_number] = {"row": row_number, "status": "error", "error": "Email already registered"}
+            elif user_in.username in taken_usernames:
+                results[row_number] = {"row": row_number, "status": "error", "error": "Username already registered"}
+            else:
+                taken_emails.add(user_in.email)
+                taken_usernames.add(user_in.username)
+                accepted.append((row_number, user_in))
+
+        if accepted:
+            try:
+                hashes = await password_hasher.hash_many(
+                    [user_in.password for _, user_in in accepted], max_jobs=self.hash_workers
+                )
+            except HasherSaturated:
+                # The response is already streaming, so report the chunk instead of failing with 503
+                for row_number, _ in accepted:
+                    results[row_number] = {"row": row_number, "status": "error", "error": "Server is busy, retry this row"}
+                return [results[row_number] for row_number, _ in chunk]
+            rows = [
+                {
+                    "username": user_in.username,
+                    "email": user_in.email,
+                    "full_name": user_in.full_name,
+                    "hashed_password": hashed_password,
+                    "is_active": True,
+                    "role_id": user_in.role_id,
+                }
+                for (_, user_in), hashed_password in zip(accepted, hashes)
+            ]
+            try:
+                inserted = await self.db.execute(
+                    insert(User).returning(User.id, sort_by_parameter_order=True), rows
+                )
+                ids = inserted.scalars().all()
+                await self.db.commit()
+            except IntegrityError:
+                await self.db.rollback()
+                for row_number, _ in accepted:
+                    results[row_number] = {"row": row_number, "status": "error", "error": "Conflicts with a concurrent write"}
+            else:
+                for (row_number, _), user_id in zip(accepted, ids):
+                    results[row_number] = {"row": row_number, "status": "created", "id": user_id}
+
+        return [results[row_number] for row_number, _ in chunk]
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+    )
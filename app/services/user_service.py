@@ -1,24 +1,89 @@
-from sqlalchemy.orm import Session
+import base64
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.schemas.user import UserCreate
 
+USER_COLUMNS = (User.id, User.username, User.email, User.full_name, User.role_id, User.is_active)
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    """Return the last-seen user id encoded in ``cursor``; raises ValueError if malformed."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return int(payload["id"])
+    except (ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def _user_listing(after_id: Optional[int], role_id: Optional[int], is_active: Optional[bool]) -> Select:
+    stmt = select(*USER_COLUMNS).order_by(User.id)
+    if after_id is not None:
+        stmt = stmt.where(User.id > after_id)
+    if role_id is not None:
+        stmt = stmt.where(User.role_id == role_id)
+    if is_active is not None:
+        stmt = stmt.where(User.is_active == is_active)
+    return stmt
+
 class UserService:
     @staticmethod
-    def create_user(db: Session, user_in: UserCreate) -> User:
+    async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
         user = User(
             username=user_in.username,
             email=user_in.email,
             full_name=user_in.full_name
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
 
     @staticmethod
-    def get_user_by_id(db: Session, user_id: int) -> User | None:
-        return db.query(User).filter(User.id == user_id).first()
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
+        result = await db.execute(select(User).where(User.id == user_id))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_user_by_username(db: AsyncSession, username: str) -> User | None:
+        result = await db.execute(select(User).where(User.username == username))
+        return result.scalars().first()
+
+
+    @staticmethod
+    async def list_users(
+        db: AsyncSession,
+        limit: int,
+        after_id: Optional[int] = None,
+        role_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Keyset page of users ordered by id, plus the cursor for the next page."""
+        result = await db.execute(_user_listing(after_id, role_id, is_active).limit(limit + 1))
+        rows = [dict(row._mapping) for row in result.all()]
+        next_cursor = encode_cursor(rows[limit - 1]["id"]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
 
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> User | None:
-        return db.query(User).filter(User.email == email).first() 
\ No newline at end of file
+    async def stream_users(
+        db: AsyncSession,
+        after_id: Optional[int] = None,
+        role_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[dict]:
+        """Stream every matching user through a server-side cursor, ``batch_size`` rows at a time."""
+        stmt = _user_listing(after_id, role_id, is_active).execution_options(yield_per=batch_size)
+        result = await db.stream(stmt)
+        async for partition in result.partitions():
+            for row in partition:
+                yield dict(row._mapping)
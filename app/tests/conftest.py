@@ -0,0 +1,79 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+# Point the app at a throwaway SQLite database before anything imports the settings.
+_db_dir = tempfile.mkdtemp(prefix="fastapi-backend-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+from app.db import seed_rbac  # noqa: E402
+from app.db.instrumentation import normalize_sql  # noqa: E402
+from app.db.session import SessionLocal, init_engines  # noqa: E402
+from app.models.user import Base  # noqa: E402
+
+engine, async_engine = init_engines()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    Base.metadata.create_all(bind=engine)
+    seed_rbac()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def query_budget():
+    """``with query_budget(n) as statements:`` fails the test if the block runs more than n statements."""
+
+    @contextmanager
+    def budget(max_queries):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engines = (engine, async_engine.sync_engine)
+        for bind in engines:
+            event.listen(bind, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for bind in engines:
+                event.remove(bind, "before_cursor_execute", record)
+        if len(statements) > max_queries:
+            listing = "\n".join(normalize_sql(statement) for statement in statements)
+            pytest.fail(f"{len(statements)} queries over a budget of {max_queries}:\n{listing}")
+
+    return budget
+
+
+@pytest.fixture
+def auth_headers(db):
+    """``auth_headers("Christie Admin")`` creates a user with that role and returns a bearer header for it."""
+    import uuid
+
+    from app.core.security import create_access_token
+    from app.models.user import Role, User
+
+    def make(role_name):
+        role_id = db.query(Role).filter_by(name=role_name).first().id
+        username = f"user-{uuid.uuid4().hex[:12]}"
+        user = User(username=username, email=f"{username}@example.com", hashed_password="x", is_active=True, role_id=role_id)
+        db.add(user)
+        db.commit()
+        return {"Authorization": f"Bearer {create_access_token({'user_id': user.id})}"}
+
+    return make
@@ -0,0 +1,60 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import require_permission, token_cache, user_cache
+from app.core.security import create_access_token, create_refresh_token
+from app.main import app
+from app.models.user import Role, User
+
+client = TestClient(app)
+
+protected_app = FastAPI()
+
+
+@protected_app.get("/firmware")
+async def upload_firmware(user: User = Depends(require_permission("firmware_update", "upload_firmware"))):
+    return {"user": user.username}
+
+
+protected_client = TestClient(protected_app)
+
+
+def _create_user(db, username, role_name=None):
+    role_id = db.query(Role).filter_by(name=role_name).first().id if role_name else None
+    user = User(username=username, email=f"{username}@example.com", hashed_password="x", is_active=True, role_id=role_id)
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def _auth(user_id):
+    return {"Authorization": f"Bearer {create_access_token({'user_id': user_id})}"}
+
+
+def test_current_user_requires_valid_token():
+    assert client.get("/users/me").status_code == 401
+    assert client.get("/users/me", headers={"Authorization": "Bearer nonsense"}).status_code == 401
+    refresh = create_refresh_token({"user_id": 1})
+    assert client.get("/users/me", headers={"Authorization": f"Bearer {refresh}"}).status_code == 401
+
+
+def test_current_user_caches_claims_and_row(db):
+    user_id = _create_user(db, "cached-user")
+    headers = _auth(user_id)
+    response = client.get("/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["username"] == "cached-user"
+    assert user_cache.get(user_id) is not None
+    assert len(token_cache) >= 1
+
+
+def test_require_permission_follows_role_assignment(db):
+    user_id = _create_user(db, "perm-user", "Client Cleaner")
+    headers = _auth(user_id)
+    assert protected_client.get("/firmware", headers=headers).status_code == 403
+
+    admin_id = db.query(Role).filter_by(name="Christie Admin").first().id
+    assert client.post(f"/users/assign-role/{user_id}/{admin_id}").status_code == 200
+    response = protected_client.get("/firmware", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"user": "perm-user"}
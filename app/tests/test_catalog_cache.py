@@ -0,0 +1,54 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.user import Module
+
+client = TestClient(app)
+
+
+def test_catalog_served_from_memory_with_etag(query_budget):
+    first = client.get("/users/permissions/")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.json()[0] == {"id": 1, "name": "view", "description": "View resource"}
+
+    with query_budget(0):
+        cached = client.get("/users/permissions/")
+    assert cached.content == first.content
+
+    not_modified = client.get("/users/permissions/", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+
+def test_catalog_write_invalidates_cache(db):
+    before = client.get("/users/modules/")
+    db.add(Module(name="Diagnostics", description="Remote diagnostics"))
+    db.commit()
+    after = client.get("/users/modules/", headers={"If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert "Diagnostics" in [module["name"] for module in after.json()]
+
+
+def test_catalog_changes_from_other_processes_invalidate_cache(db):
+    import asyncio
+
+    from app.services.cache_versions import CacheVersionWatcher, bump_shared
+    from app.services.catalog_cache import catalog_cache
+
+    watcher = CacheVersionWatcher(interval=1)
+    watcher.watch("catalog", catalog_cache.bump_version)
+    asyncio.run(watcher.poll())
+    before = client.get("/users/modules/")
+
+    # Written by another worker: this process's listeners never fire
+    db.execute(Module.__table__.insert().values(name="Remote Module", description="added elsewhere"))
+    bump_shared(db, "catalog")
+    db.commit()
+    assert client.get("/users/modules/", headers={"If-None-Match": before.headers["ETag"]}).status_code == 304
+
+    assert asyncio.run(watcher.poll()) == ["catalog"]
+    after = client.get("/users/modules/", headers={"If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert "Remote Module" in [module["name"] for module in after.json()]
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+
+from app.db.session import async_engine
+from app.main import app
+from app.models.cleaning import CleaningLog
+from app.services.cleaning_log import GroupCommitter
+
+client = TestClient(app)
+
+
+def _row(device_id, user_id=1):
+    return {"device_id": device_id, "user_id": user_id, "cleaned_at": datetime(2026, 1, 1), "notes": None}
+
+
+def test_concurrent_logs_share_one_commit(db):
+    commits = []
+
+    def record_commit(conn):
+        commits.append(conn)
+
+    async def scenario():
+        committer = GroupCommitter(window=0.05, max_batch=1000)
+        ids = await asyncio.gather(*(committer.submit(_row(f"group-{i}")) for i in range(50)))
+        # The async engine's pool belongs to the loop asyncio.run is about to close
+        await async_engine.dispose()
+        return ids
+
+    event.listen(async_engine.sync_engine, "commit", record_commit)
+    try:
+        ids = asyncio.run(scenario())
+    finally:
+        event.remove(async_engine.sync_engine, "commit", record_commit)
+    assert len(set(ids)) == 50
+    assert len(commits) == 1
+    stored = dict(db.query(CleaningLog.id, CleaningLog.device_id).filter(CleaningLog.id.in_(ids)).all())
+    assert [stored[row_id] for row_id in ids] == [f"group-{i}" for i in range(50)]
+
+
+def test_a_bad_row_fails_alone(db):
+    async def scenario():
+        committer = GroupCommitter(window=0.05, max_batch=1000)
+        results = await asyncio.gather(
+            committer.submit(_row("isolated-1")),
+            committer.submit({**_row("isolated-2"), "cleaned_at": None}),
+            committer.submit(_row("isolated-3")),
+            return_exceptions=True,
+        )
+        await async_engine.dispose()
+        return results
+
+    first, bad, third = asyncio.run(scenario())
+    assert isinstance(first, int) and isinstance(third, int)
+    assert isinstance(bad, Exception)
+    assert db.scalar(select(func.count()).select_from(CleaningLog).where(CleaningLog.device_id.like("isolated-%"))) == 2
+
+
+def test_a_failed_commit_is_not_retried(db):
+    commits = []
+
+    def fail_commit(conn):
+        commits.append(conn)
+        raise RuntimeError("connection lost during commit")
+
+    async def scenario():
+        committer = GroupCommitter(window=0.05, max_batch=1000)
+        results = await asyncio.gather(
+            *(committer.submit(_row(f"uncertain-{i}")) for i in range(3)), return_exceptions=True
+        )
+        await async_engine.dispose()
+        return results
+
+    event.listen(async_engine.sync_engine, "commit", fail_commit)
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        event.remove(async_engine.sync_engine, "commit", fail_commit)
+    # The rows may have landed, so writing them again one by one could duplicate them
+    assert len(commits) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_full_batches_do_not_wait_for_the_window():
+    async def scenario():
+        committer = GroupCommitter(window=10, max_batch=5)
+        ids = await asyncio.wait_for(asyncio.gather(*(committer.submit(_row(f"full-{i}")) for i in range(12))), 5)
+        await async_engine.dispose()
+        return ids
+
+    assert len(asyncio.run(scenario())) == 12
+
+
+def test_cleaning_log_endpoints(auth_headers):
+    cleaner = auth_headers("Client Cleaner")
+    created = client.post("/cleaning/logs", json={"device_id": "washer-9", "notes": "filters"}, headers=cleaner)
+    assert created.status_code == 201
+    second = client.post("/cleaning/logs", json={"device_id": "washer-9", "cleaned_at": "2026-03-01T10:00:00+02:00"}, headers=cleaner)
+    assert second.json()["cleaned_at"] == "2026-03-01T08:00:00"
+
+    history = client.get("/cleaning/logs", params={"device_id": "washer-9"}, headers=cleaner).json()
+    assert [log["id"] for log in history] == [second.json()["id"], created.json()["id"]]
+    assert history[1]["notes"] == "filters"
+    page = client.get("/cleaning/logs", params={"device_id": "washer-9", "before_id": second.json()["id"]}, headers=cleaner)
+    assert [log["id"] for log in page.json()] == [created.json()["id"]]
+
+    technician = auth_headers("Service Technician")
+    assert client.post("/cleaning/logs", json={"device_id": "washer-9"}, headers=technician).status_code == 403
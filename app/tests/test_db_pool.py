@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.security import create_access_token
+from app.main import app
+from app.models.user import Role, User
+
+client = TestClient(app)
+
+
+def _auth(db, username, role_name):
+    role_id = db.query(Role).filter_by(name=role_name).first().id
+    user = User(username=username, email=f"{username}@example.com", hashed_password="x", is_active=True, role_id=role_id)
+    db.add(user)
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token({'user_id': user.id})}"}
+
+
+def test_sqlite_connections_use_wal(db):
+    assert db.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    assert db.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+    assert db.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+
+def test_pool_stats_requires_permission(db):
+    assert client.get("/internal/db/pool").status_code == 401
+    headers = _auth(db, "pool-cleaner", "Client Cleaner")
+    assert client.get("/internal/db/pool", headers=headers).status_code == 403
+
+
+def test_pool_stats_endpoint(db):
+    headers = _auth(db, "pool-admin", "Christie Admin")
+    client.get("/users/roles/")
+    response = client.get("/internal/db/pool", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    for name in ("sync", "async"):
+        stats = body[name]
+        assert stats["pool_class"].startswith("Instrumented")
+        assert {"checked_out", "idle", "overflow", "timeouts", "wait_seconds"} <= stats.keys()
+    assert body["async"]["wait_seconds"]["count"] >= 1
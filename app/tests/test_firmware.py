@@ -0,0 +1,82 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.firmware as firmware_api
+from app.main import app
+from app.services.firmware_store import ArtifactTooLarge, FirmwareStore
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = FirmwareStore(str(tmp_path), max_bytes=1024 * 1024, write_buffer=4096)
+    monkeypatch.setattr(firmware_api, "firmware_store", store)
+    return store
+
+
+def _chunks(data, size):
+    async def stream():
+        for i in range(0, len(data), size):
+            yield data[i:i + size]
+    return stream()
+
+
+def test_store_hashes_while_streaming(store):
+    image = os.urandom(50_000)
+    digest, size = asyncio.run(store.save(_chunks(image, 3000)))
+    assert (digest, size) == (hashlib.sha256(image).hexdigest(), len(image))
+    assert store.path_for(digest).read_bytes() == image
+    # Same bytes again: one copy, no leftover temporary file
+    assert asyncio.run(store.save(_chunks(image, 7000))) == (digest, size)
+    assert os.listdir(store.root / "incoming") == []
+
+
+def test_store_rejects_oversized_upload_without_leaving_files(store):
+    with pytest.raises(ArtifactTooLarge):
+        asyncio.run(store.save(_chunks(b"x" * (store.max_bytes + 1), 65536)))
+    assert os.listdir(store.root / "incoming") == []
+    assert store.locate("../../etc/passwd") is None
+
+
+def test_upload_and_ranged_download(store, auth_headers):
+    headers = auth_headers("Christie Admin")
+    image = os.urandom(20_000)
+    digest = hashlib.sha256(image).hexdigest()
+
+    response = client.post("/firmware?version=1.2.0&filename=fw.bin", content=image, headers=headers)
+    assert response.status_code == 201
+    assert response.json()["sha256"] == digest
+    assert response.json()["size"] == len(image)
+    again = client.post("/firmware?version=1.2.0", content=image, headers=headers)
+    assert again.status_code == 200
+    assert again.json()["id"] == response.json()["id"]
+    assert digest in [item["sha256"] for item in client.get("/firmware", headers=headers).json()]
+
+    full = client.get(f"/firmware/{digest}", headers=headers)
+    assert full.status_code == 200
+    assert full.content == image
+    assert full.headers["etag"] == f'"{digest}"'
+    assert full.headers["accept-ranges"] == "bytes"
+
+    resumed = client.get(f"/firmware/{digest}", headers={**headers, "Range": "bytes=15000-"})
+    assert resumed.status_code == 206
+    assert resumed.headers["content-range"] == f"bytes 15000-19999/{len(image)}"
+    assert resumed.content == image[15000:]
+    tail = client.get(f"/firmware/{digest}", headers={**headers, "Range": "bytes=-100"})
+    assert tail.content == image[-100:]
+    stale = client.get(f"/firmware/{digest}", headers={**headers, "Range": "bytes=0-9", "If-Range": '"other"'})
+    assert stale.status_code == 200
+    assert client.get(f"/firmware/{digest}", headers={**headers, "Range": "bytes=20000-"}).status_code == 416
+    assert client.get(f"/firmware/{digest}", headers={**headers, "If-None-Match": f'"{digest}"'}).status_code == 304
+    assert client.get(f"/firmware/{'0' * 64}", headers=headers).status_code == 404
+
+
+def test_firmware_requires_permissions(store, auth_headers):
+    headers = auth_headers("Service Technician")
+    assert client.post("/firmware?version=1", content=b"image", headers=headers).status_code == 403
+    assert client.get(f"/firmware/{'0' * 64}", headers=headers).status_code == 403
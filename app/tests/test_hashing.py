@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.hashing import HasherSaturated, PasswordHasher, password_hasher
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_process_pool_hash_round_trip():
+    hasher = PasswordHasher(workers=1, max_pending=4, start_method="spawn")
+
+    async def round_trip():
+        await hasher.start()
+        hashed = await hasher.hash("secret-password")
+        return await hasher.verify("secret-password", hashed), await hasher.verify("wrong-password", hashed)
+    try:
+        assert asyncio.run(round_trip()) == (True, False)
+        assert hasher._executor is not None
+    finally:
+        hasher.shutdown()
+
+
+def test_saturated_hasher_rejects_immediately():
+    hasher = PasswordHasher(workers=0, max_pending=0)
+    with pytest.raises(HasherSaturated):
+        asyncio.run(hasher.hash("secret-password"))
+
+
+def test_hash_many_caps_jobs(monkeypatch):
+    hasher = PasswordHasher(workers=4, max_pending=64)
+    jobs = []
+
+    async def submit(fn, passwords):
+        jobs.append(len(passwords))
+        return [f"hash-{password}" for password in passwords]
+
+    monkeypatch.setattr(hasher, "_submit", submit)
+    hashes = asyncio.run(hasher.hash_many([str(i) for i in range(10)], max_jobs=2))
+    assert hashes == [f"hash-{i}" for i in range(10)]
+    assert jobs == [5, 5]
+
+
+def test_create_user_and_login():
+    response = client.post("/users/", json={
+        "username": "hasher-user",
+        "email": "hasher-user@example.com",
+        "password": "secret-password",
+    })
+    assert response.status_code == 200
+
+    response = client.post("/users/login", json={"username": "hasher-user", "password": "secret-password"})
+    assert response.json()["success"] is True
+    response = client.post("/users/login", json={"username": "hasher-user", "password": "wrong-password"})
+    assert response.json()["success"] is False
+
+
+def test_create_user_returns_503_when_hasher_saturated(monkeypatch):
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    response = client.post("/users/", json={
+        "username": "busy-user",
+        "email": "busy-user@example.com",
+        "password": "secret-password",
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -1,9 +1,28 @@
+import os
+import subprocess
+import sys
+
 from fastapi.testclient import TestClient
-from app.main import app
+from app.main import app, create_app
 
 client = TestClient(app)
 
 def test_read_root():
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {"message": "Welcome to the FastAPI backend!"} 
\ No newline at end of file
+    assert response.json() == {"message": "Welcome to the FastAPI backend!"}
+
+def test_import_defers_engines_and_crypto():
+    code = (
+        "import sys, app.main, app.db.session as session; "
+        "print(sorted(m for m in ('jose', 'passlib', 'aiosqlite') if m in sys.modules), bool(session._engines))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, env=os.environ.copy(), check=True, capture_output=True, text=True
+    ).stdout
+    assert output.strip() == "[] False"
+
+def test_factory_builds_app():
+    with TestClient(create_app()) as factory_client:
+        assert factory_client.get("/").status_code == 200
@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+
+from app.core.metrics import REQUEST_DB_TIME, REQUEST_LATENCY, REQUESTS_TOTAL, Registry
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    registry.counter("jobs_total", "Jobs run.", ("kind",)).labels('say "hi"').inc(2)
+    histogram = registry.histogram("job_seconds", "Job time.", buckets=(0.1, 1.0))
+    histogram.labels().observe(0.5)
+    text = registry.render()
+    assert '# TYPE jobs_total counter\njobs_total{kind="say \\"hi\\""} 2.0' in text
+    assert 'job_seconds_bucket{le="0.1"} 0' in text
+    assert 'job_seconds_bucket{le="1.0"} 1' in text
+    assert 'job_seconds_bucket{le="+Inf"} 1' in text
+    assert "job_seconds_count 1" in text
+
+
+def test_requests_are_recorded_per_route_template():
+    before = REQUEST_LATENCY.labels("GET", "/users/{user_id}").count
+    db_before = REQUEST_DB_TIME.labels("GET", "/users/{user_id}").sum
+    client.get("/users/424242")
+    assert REQUEST_LATENCY.labels("GET", "/users/{user_id}").count == before + 1
+    assert REQUEST_DB_TIME.labels("GET", "/users/{user_id}").sum > db_before
+    assert REQUESTS_TOTAL.labels("GET", "/users/{user_id}", "404").value >= 1
+
+
+def test_metrics_endpoint(monkeypatch):
+    client.get("/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/",status="200"}' in body
+    assert "http_requests_in_flight 1.0" in body
+    assert "threadpool_queue_depth" in body
+    assert "http_request_bcrypt_seconds" in body
+
+    monkeypatch.setattr("app.api.metrics.settings.METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
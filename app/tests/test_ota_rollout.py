@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.firmware as firmware_api
+import app.api.ota as ota_api
+from app.db.session import async_engine
+from app.main import app
+from app.models.ota import OtaRollout, OtaSchedulerState, OtaTarget
+from app.services.firmware_store import FirmwareStore
+from app.services.ota_rollout import RolloutError, RolloutScheduler
+
+client = TestClient(app)
+SHA = "a" * 64
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clean_ota(db):
+    for model in (OtaTarget, OtaRollout, OtaSchedulerState):
+        db.query(model).delete()
+    db.commit()
+
+
+def make_scheduler(clock, **overrides):
+    options = dict(max_active=100, egress_bytes_per_sec=0, lease_seconds=60, max_attempts=2, max_failure_ratio=0.2)
+    options.update(overrides)
+    return RolloutScheduler(clock=clock, **options)
+
+
+def run(scenario):
+    async def wrapper():
+        try:
+            return await scenario()
+        finally:
+            # The async engine's pool belongs to the loop asyncio.run is about to close
+            await async_engine.dispose()
+    return asyncio.run(wrapper())
+
+
+async def finish_all(scheduler, success=True):
+    for device_id in list(scheduler.assignments):
+        await scheduler.report(device_id, success)
+
+
+def test_waves_release_in_turn():
+    scheduler = make_scheduler(Clock())
+    devices = [f"dev-{i}" for i in range(200)]
+
+    async def scenario():
+        rollout_id = await scheduler.create(SHA, "2.0", 1000, devices, [0.01, 0.1, 1.0])
+        sizes = [len(scheduler.assignments)]
+        await finish_all(scheduler)
+        status = await scheduler.status(rollout_id)
+        sizes.append(len(scheduler.assignments))
+        await finish_all(scheduler)
+        sizes.append(len(scheduler.assignments))
+        while scheduler.assignments:
+            await finish_all(scheduler)
+        # Devices are free for the next rollout once this one is done
+        await scheduler.create(SHA, "2.1", 1000, devices[:5], [1.0])
+        return sizes, status, await scheduler.status(rollout_id)
+
+    sizes, midway, done = run(scenario)
+    assert sizes == [2, 18, 100]
+    assert midway["wave"] == 1
+    assert done["status"] == "completed"
+    assert done["devices"]["completed"] == 200
+
+
+def test_caps_are_shared_by_every_scheduler_instance():
+    clock = Clock()
+    # Two workers, each with its own scheduler, against the same database
+    first = make_scheduler(clock, max_active=3, egress_bytes_per_sec=2500)
+    second = make_scheduler(clock, max_active=3, egress_bytes_per_sec=2500)
+
+    async def scenario():
+        await first.create(SHA, "2.0", 1000, [f"dev-{i}" for i in range(10)], [1.0])
+        await second.dispatch()
+        # The one-second burst admits three 1000-byte images, going 500 bytes into debt
+        granted = len(second.assignments)
+        await finish_all(second)
+        await first.dispatch()
+        after_reports = len(first.assignments)
+        clock.now += 1
+        await second.dispatch()
+        return granted, after_reports, len(second.assignments)
+
+    assert run(scenario) == (3, 0, 2)
+
+
+def test_expired_leases_are_retried_then_failed_and_pause_the_rollout():
+    clock = Clock()
+    scheduler = make_scheduler(clock)
+
+    async def scenario():
+        rollout_id = await scheduler.create(SHA, "2.0", 1000, [f"dev-{i}" for i in range(10)], [0.5, 1.0])
+        stuck = sorted(scheduler.assignments)[:2]
+        for device_id in sorted(scheduler.assignments)[2:]:
+            await scheduler.report(device_id, True)
+        clock.now += 61
+        await scheduler.dispatch()
+        retried = sorted(scheduler.assignments)
+        clock.now += 61
+        await scheduler.dispatch()
+        # 2 of 5 failed in wave 0, over the 20% limit
+        paused = await scheduler.status(rollout_id)
+        assert not scheduler.assignments
+        await scheduler.resume(rollout_id)
+        return stuck, retried, paused, await scheduler.status(rollout_id), len(scheduler.assignments)
+
+    stuck, retried, paused, resumed, granted = run(scenario)
+    assert retried == stuck
+    assert (paused["status"], paused["devices"]["failed"]) == ("paused", 2)
+    assert (resumed["status"], resumed["wave"], granted) == ("active", 1, 5)
+
+
+def test_invalid_and_overlapping_rollouts_are_rejected():
+    scheduler = make_scheduler(Clock())
+
+    async def scenario():
+        with pytest.raises(RolloutError, match="Waves"):
+            await scheduler.create(SHA, "2.0", 1, ["a"], [0.5, 0.2, 1.0])
+        with pytest.raises(RolloutError, match="Waves"):
+            await scheduler.create(SHA, "2.0", 1, ["a"], [0.5])
+        rollout_id = await scheduler.create(SHA, "2.0", 1, ["a", "b"], [1.0])
+        with pytest.raises(RolloutError, match="already in an active rollout"):
+            await scheduler.create(SHA, "2.0", 1, ["b", "c"], [1.0])
+        await scheduler.cancel(rollout_id)
+        assert not scheduler.assignments
+        await scheduler.create(SHA, "2.0", 1, ["b", "c"], [1.0])
+
+    run(scenario)
+
+
+def test_long_poll_wakes_every_waiting_poller():
+    scheduler = make_scheduler(Clock(), max_active=1)
+
+    async def scenario():
+        await scheduler.create(SHA, "2.0", 1, ["first", "second"], [1.0])
+        holder = next(iter(scheduler.assignments))
+        other = "second" if holder == "first" else "first"
+        # A poll that times out must not strand a concurrent poll for the same device
+        assert await asyncio.gather(scheduler.wait_for(other, 0.01), asyncio.sleep(0)) == [None, None]
+        short = asyncio.create_task(scheduler.wait_for(other, 0.01))
+        long = asyncio.create_task(scheduler.wait_for(other, 5))
+        assert await short is None
+        await scheduler.report(holder, True)
+        return await asyncio.wait_for(long, 1)
+
+    assert run(scenario).version == "2.0"
+
+
+def test_rollout_endpoints(tmp_path, monkeypatch, auth_headers):
+    monkeypatch.setattr(firmware_api, "firmware_store", FirmwareStore(str(tmp_path), 1024 * 1024, 4096))
+    monkeypatch.setattr(ota_api, "rollout_scheduler", make_scheduler(Clock()))
+    headers = auth_headers("Christie Admin")
+    image = os.urandom(4096)
+    digest = hashlib.sha256(image).hexdigest()
+    assert client.post("/firmware?version=3.0", content=image, headers=headers).status_code in (200, 201)
+
+    created = client.post("/ota/rollouts", json={"sha256": digest, "device_ids": ["ota-1", "ota-2"], "waves": [0.5, 1.0]}, headers=headers)
+    assert created.status_code == 201
+    rollout_id = created.json()["id"]
+    assert created.json()["devices"]["downloading"] == 1
+    assert client.post("/ota/rollouts", json={"sha256": digest, "device_ids": ["ota-2"]}, headers=headers).status_code == 409
+    assert client.post("/ota/rollouts", json={"sha256": "b" * 64, "device_ids": ["x"]}, headers=headers).status_code == 404
+    assert client.get("/ota/rollouts/999999", headers=headers).status_code == 404
+
+    polls = {device_id: client.get(f"/ota/devices/{device_id}/assignment", headers=headers) for device_id in ("ota-1", "ota-2")}
+    granted = next(device_id for device_id, response in polls.items() if response.status_code == 200)
+    assert sorted(response.status_code for response in polls.values()) == [200, 204]
+    assert polls[granted].json()["download_url"] == f"/firmware/{digest}"
+
+    report = client.post(f"/ota/devices/{granted}/report", json={"status": "completed"}, headers=headers)
+    assert report.status_code == 204
+    assert client.post(f"/ota/devices/{granted}/report", json={"status": "completed"}, headers=headers).status_code == 404
+    status = client.get(f"/ota/rollouts/{rollout_id}", headers=headers).json()
+    assert (status["wave"], status["devices"]["completed"], status["devices"]["downloading"]) == (1, 1, 1)
+
+    technician = auth_headers("Service Technician")
+    assert client.get("/ota/devices/ota-1/assignment", headers=technician).status_code == 403
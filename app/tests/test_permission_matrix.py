@@ -0,0 +1,100 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.db.session import AsyncSessionLocal
+from app.main import app
+from app.models.user import Permission, Resource, Role, RoleResourcePermission
+from app.models.cache import CacheVersion
+from app.services import permission_matrix
+from app.services.cache_versions import CacheVersionWatcher, bump_shared
+
+client = TestClient(app)
+
+
+def _role_id(db, name):
+    return db.query(Role).filter_by(name=name).first().id
+
+
+def _has_permission(role_id, resource, permission):
+    async def check():
+        async with AsyncSessionLocal() as session:
+            return await permission_matrix.has_permission(session, role_id, resource, permission)
+    return asyncio.run(check())
+
+
+def _matrix():
+    async def load():
+        async with AsyncSessionLocal() as session:
+            return await permission_matrix.get_permission_matrix(session)
+    return asyncio.run(load())
+
+
+def test_matrix_answers_seeded_grants(db):
+    cleaner = _role_id(db, "Client Cleaner")
+    admin = _role_id(db, "Christie Admin")
+    assert _has_permission(cleaner, "cleaning_screen", "register")
+    assert not _has_permission(cleaner, "firmware_update", "upload_firmware")
+    assert _has_permission(admin, "firmware_update", "upload_firmware")
+    assert not _has_permission(None, "cleaning_screen", "view")
+    assert not _has_permission(admin, "no_such_resource", "view")
+
+
+def test_matrix_is_reused_until_version_bumps(db):
+    first = _matrix()
+    assert _matrix() is first
+    permission_matrix.bump_version()
+    assert _matrix() is not first
+
+
+def test_permission_table_write_invalidates_matrix(db):
+    tech = _role_id(db, "Service Technician")
+    resource = db.query(Resource).filter_by(name="ota_update").first()
+    perm = db.query(Permission).filter_by(name="view").first()
+    assert not _has_permission(tech, "ota_update", "view")
+
+    grant = RoleResourcePermission(role_id=tech, resource_id=resource.id, permission_id=perm.id)
+    db.add(grant)
+    db.commit()
+    assert _has_permission(tech, "ota_update", "view")
+
+    db.delete(grant)
+    db.commit()
+    assert not _has_permission(tech, "ota_update", "view")
+
+
+def test_rbac_writes_in_other_processes_invalidate_the_matrix(db):
+    def shared_version():
+        db.expire_all()
+        row = db.get(CacheVersion, "rbac")
+        return row.version if row else 0
+
+    watcher = CacheVersionWatcher(interval=1)
+    watcher.watch("rbac", permission_matrix.bump_version)
+    assert asyncio.run(watcher.poll()) == []
+
+    # An ORM write bumps the shared counter in its own transaction
+    before = shared_version()
+    role = Role(name="Shared Version Role")
+    db.add(role)
+    db.commit()
+    assert shared_version() == before + 1
+
+    # Another worker, or the seed CLI, committed a change this process never saw
+    first = _matrix()
+    bump_shared(db, "rbac")
+    db.commit()
+    assert _matrix() is first
+    assert asyncio.run(watcher.poll()) == ["rbac"]
+    assert _matrix() is not first
+    assert asyncio.run(watcher.poll()) == []
+
+    db.delete(role)
+    db.commit()
+
+
+def test_check_role_permission_endpoint(db):
+    cleaner = _role_id(db, "Client Cleaner")
+    response = client.get(f"/users/role/{cleaner}/can/cleaning_screen/view")
+    assert response.status_code == 200
+    assert response.json()["allowed"] is True
@@ -0,0 +1,45 @@
+import logging
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.instrumentation import QueryStats, normalize_sql
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_normalize_sql_collapses_literals_and_in_lists():
+    sql = "SELECT users.id\n  FROM users WHERE users.id IN (?, ?, ?) AND name = 'o''brien' LIMIT 10 OFFSET :param_1"
+    assert normalize_sql(sql) == "SELECT users.id FROM users WHERE users.id IN (...) AND name = ? LIMIT ? OFFSET ?"
+    assert normalize_sql("SELECT x FROM t WHERE id = %(id_1)s AND y IN ($1, $2)") == (
+        "SELECT x FROM t WHERE id = ? AND y IN (...)"
+    )
+
+
+def test_n_plus_one_suspects_group_by_shape():
+    stats = QueryStats()
+    stats.statements = {
+        "SELECT * FROM roles WHERE id IN (?, ?)": 2,
+        "SELECT * FROM roles WHERE id IN (?)": 3,
+        "SELECT * FROM users": 1,
+    }
+    assert stats.n_plus_one_suspects(5) == {"SELECT * FROM roles WHERE id IN (...)": 5}
+
+
+def test_debug_mode_reports_query_headers(monkeypatch):
+    assert "X-DB-Query-Count" not in client.get("/users/424242").headers
+    monkeypatch.setattr(settings, "DEBUG", True)
+    response = client.get("/users/424242")
+    assert int(response.headers["X-DB-Query-Count"]) >= 1
+    assert float(response.headers["X-DB-Time-ms"]) >= 0
+
+
+def test_slow_queries_and_repeated_shapes_are_logged(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    monkeypatch.setattr(settings, "N_PLUS_ONE_THRESHOLD", 1)
+    with caplog.at_level(logging.WARNING, logger="app.db.queries"):
+        client.get("/users/424242")
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(message.startswith("Slow query") and "FROM users" in message for message in messages)
+    assert any(message.startswith("Possible N+1 in GET /users/{user_id}") for message in messages)
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, select
+
+from app.db.explain import full_table_scans
+from app.db.session import AsyncSessionLocal, async_engine
+from app.models.user import User
+from app.services.rbac_service import RBACService
+from app.services.telemetry_query import fetch_series
+from app.services.user_service import UserService
+
+# Every query a service runs on a request path must be answerable from an index.
+# Whole-table reads that are deliberate (permission matrix and catalog builds,
+# the first page of an unfiltered listing) are not listed here.
+SERVICE_QUERIES = {
+    "user_by_id": lambda db: UserService.get_user_by_id(db, 1),
+    "user_by_email": lambda db: UserService.get_user_by_email(db, "someone@example.com"),
+    "user_by_username": lambda db: UserService.get_user_by_username(db, "someone"),
+    "users_after_cursor": lambda db: UserService.list_users(db, limit=10, after_id=10),
+    "users_by_role": lambda db: UserService.list_users(db, limit=10, role_id=1),
+    "users_by_role_after_cursor": lambda db: UserService.list_users(db, limit=10, after_id=10, role_id=1),
+    "role_permissions": lambda db: RBACService.get_role_permissions(db, 1),
+    "permissions_for_roles": lambda db: RBACService.get_permissions_for_roles(db, [1, 2, 3]),
+    "roles_with_permission": lambda db: RBACService.get_roles_with_permission(db, "cleaning_screen", "view"),
+    "telemetry_series": lambda db: fetch_series(db, "dev-1", "temp", 0, 60_000, chunk_size=1000),
+}
+
+
+def _scans(call):
+    async def run():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            async with AsyncSessionLocal() as db:
+                await call(db)
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+        assert statements
+        async with async_engine.connect() as conn:
+            return {
+                statement: scans
+                for statement, parameters in statements
+                if (scans := await full_table_scans(conn, statement, parameters))
+            }
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("name", SERVICE_QUERIES)
+def test_service_query_avoids_full_scans(name):
+    assert _scans(SERVICE_QUERIES[name]) == {}
+
+
+def test_unindexed_filter_is_reported():
+    scans = _scans(lambda db: db.execute(select(User.id).where(User.full_name == "Nobody")))
+    assert [steps for steps in scans.values()] == [["SCAN users"]]
@@ -0,0 +1,77 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.user as user_api
+from app.core.rate_limit import (
+    LoginRateLimiter,
+    MemoryBackend,
+    RateLimited,
+    SharedMemoryBackend,
+    sliding_window,
+)
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_sliding_window_weights_previous_window():
+    state = None
+    for _ in range(10):
+        state, retry_after = sliding_window(state, limit=10, window=60, now=100)
+        assert retry_after == 0
+    state, retry_after = sliding_window(state, limit=10, window=60, now=110)
+    assert retry_after == 10  # the window ends at 120 s, after which the old hits start to decay
+    # Halfway through the next window the 10 old hits count as 5
+    for _ in range(5):
+        state, retry_after = sliding_window(state, limit=10, window=60, now=150)
+        assert retry_after == 0
+    assert sliding_window(state, limit=10, window=60, now=150)[1] > 0
+    assert sliding_window(state, limit=10, window=60, now=300)[1] == 0
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_keys=2)
+    for key in ("a", "b", "a", "c"):
+        backend.hit(key, limit=5, window=60, now=0)
+    assert len(backend) == 2
+    assert list(backend._states) == ["a", "c"]
+
+
+def test_shared_memory_backend_is_shared_between_instances():
+    name = f"test-limits-{uuid.uuid4().hex[:8]}"
+    first = SharedMemoryBackend(name, slots=64)
+    second = SharedMemoryBackend(name, slots=64)
+    try:
+        assert first.hit("user:alice", limit=2, window=60, now=0) == 0
+        assert second.hit("user:alice", limit=2, window=60, now=0) == 0
+        assert first.hit("user:alice", limit=2, window=60, now=0) > 0
+        assert second.hit("user:bob", limit=2, window=60, now=0) == 0
+    finally:
+        second.close()
+        first.close(unlink=True)
+
+
+def test_limiter_checks_username_and_ip():
+    limiter = LoginRateLimiter(MemoryBackend(100), per_username=2, per_ip=3, window=60, clock=lambda: 0)
+    limiter.check("Alice", "10.0.0.1")
+    limiter.check("alice ", "10.0.0.2")
+    with pytest.raises(RateLimited):
+        limiter.check("ALICE", "10.0.0.3")
+    limiter.check("bob", "10.0.0.9")
+    limiter.check("carol", "10.0.0.9")
+    limiter.check("dave", "10.0.0.9")
+    with pytest.raises(RateLimited):
+        limiter.check("erin", "10.0.0.9")
+
+
+def test_login_rejected_with_retry_after_before_any_query(monkeypatch, query_budget):
+    limiter = LoginRateLimiter(MemoryBackend(100), per_username=1, per_ip=100, window=60)
+    monkeypatch.setattr(user_api, "get_login_limiter", lambda: limiter)
+    credentials = {"username": f"stuffed_{uuid.uuid4().hex[:8]}", "password": "guess"}
+    assert client.post("/users/login", json=credentials).json()["success"] is False
+    with query_budget(0):
+        response = client.post("/users/login", json=credentials)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
@@ -0,0 +1,69 @@
+import copy
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app.db.rbac_seed import CatalogError, load_catalog, sync_rbac
+from app.models.user import Base, Resource, RoleResourcePermission
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rbac.db'}")
+    Base.metadata.create_all(bind=engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    with Session(engine) as db:
+        db.info["statements"] = statements
+        yield db
+    engine.dispose()
+
+
+def test_second_sync_only_reads(session):
+    first = sync_rbac(session, load_catalog())
+    session.commit()
+    assert first.inserted["role_resource_permissions"] == 8 * 8 + 2 + 1
+
+    session.info["statements"].clear()
+    second = sync_rbac(session, load_catalog())
+    assert not second.changed
+    assert all(statement.lstrip().upper().startswith("SELECT") for statement in session.info["statements"])
+    assert len(session.info["statements"]) == 5
+
+
+def test_large_catalog_uses_set_based_writes(session):
+    catalog = load_catalog()
+    catalog["resources"] += [{"name": f"tenant_resource_{i}", "description": None, "module": "Telemetry"} for i in range(2000)]
+    report = sync_rbac(session, catalog)
+    session.commit()
+    assert report.inserted["resources"] == 2008
+    assert report.inserted["role_resource_permissions"] == 2008 * 8 + 3
+    # One read per table, one insert per table and one id lookup per table with new rows
+    assert len(session.info["statements"]) < 20
+
+
+def test_diff_updates_prunes_and_dry_runs(session):
+    sync_rbac(session, load_catalog())
+    session.commit()
+    catalog = copy.deepcopy(load_catalog())
+    catalog["resources"][0]["description"] = "Cleaning screen v2"
+    catalog["grants"]["Client Cleaner"] = {"cleaning_screen": ["view"]}
+
+    preview = sync_rbac(session, catalog, prune=True, dry_run=True)
+    assert preview.updated["resources"] == 1
+    assert preview.deleted["role_resource_permissions"] == 1
+    assert session.scalar(select(Resource.description).where(Resource.name == "cleaning_screen")) == "Cleaning screen"
+
+    grants_before = len(session.scalars(select(RoleResourcePermission.id)).all())
+    sync_rbac(session, catalog, prune=True)
+    session.commit()
+    assert session.scalar(select(Resource.description).where(Resource.name == "cleaning_screen")) == "Cleaning screen v2"
+    assert len(session.scalars(select(RoleResourcePermission.id)).all()) == grants_before - 1
+
+
+def test_unknown_names_are_rejected(session):
+    catalog = load_catalog()
+    catalog["grants"]["Client Admin"] = {"no_such_resource": ["view"]}
+    with pytest.raises(CatalogError, match="no_such_resource"):
+        sync_rbac(session, catalog)
@@ -0,0 +1,31 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.user import Role
+
+client = TestClient(app)
+
+
+def _role_id(db, name):
+    return db.query(Role).filter_by(name=name).first().id
+
+
+def test_role_permissions_uses_single_query(db, query_budget):
+    admin = _role_id(db, "Christie Admin")
+    with query_budget(1):
+        response = client.get(f"/users/role/{admin}/permissions/")
+    assert response.status_code == 200
+    assert len(response.json()) == 8 * 8
+    assert {"resource": "cleaning_screen", "permission": "view"} in response.json()
+
+
+def test_bulk_role_permissions_grouped_by_module(db, query_budget):
+    admin = _role_id(db, "Christie Admin")
+    cleaner = _role_id(db, "Client Cleaner")
+    with query_budget(1):
+        response = client.get("/users/roles/permissions/", params={"role_ids": [cleaner, admin, 999]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body[str(cleaner)] == {"Cleaning": {"cleaning_screen": ["view", "register"]}}
+    assert len(body[str(admin)]) == 8
+    assert body["999"] == {}
@@ -0,0 +1,107 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.routing import ReplicaSet, RoutingSession, recent_writes, use_primary
+from app.db.session import AsyncSessionLocal, async_engine
+from app.main import app
+from app.models.user import Base, Role, User
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def replica(tmp_path):
+    """A second SQLite file standing in for a replica: same schema, its own rows."""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(Role.__table__.insert(), [{"name": "Replica Only Role"}])
+    sync_engine.dispose()
+    engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+def _sessions(*replicas):
+    replica_set = ReplicaSet([engine.sync_engine for engine in replicas], cooldown=30)
+    return async_sessionmaker(
+        bind=async_engine, sync_session_class=RoutingSession, expire_on_commit=False, info={"replicas": replica_set}
+    ), replica_set
+
+
+def _role_names(session):
+    async def run():
+        return set((await session.scalars(select(Role.name))).all())
+    return run()
+
+
+def test_reads_go_to_replica_and_writes_pin_primary(replica):
+    sessions, _ = _sessions(replica)
+
+    async def run():
+        async with sessions() as db:
+            assert await _role_names(db) == {"Replica Only Role"}
+        async with sessions() as db:
+            db.add(Role(name=f"Routing {uuid.uuid4().hex[:8]}"))
+            await db.flush()
+            names = await _role_names(db)
+            assert "Christie Admin" in names
+            await db.rollback()
+        async with sessions() as db:
+            use_primary(db)
+            assert "Replica Only Role" not in await _role_names(db)
+
+    asyncio.run(run())
+
+
+def test_round_robin_skips_failed_replicas(replica, tmp_path):
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    sessions, replica_set = _sessions(broken, replica)
+    assert [replica_set.choose() for _ in range(4)] == [broken.sync_engine, replica.sync_engine] * 2
+
+    async def run():
+        async with sessions() as db:
+            with pytest.raises(Exception):
+                await _role_names(db)
+        # The failed connect put the broken replica into cooldown
+        for _ in range(3):
+            async with sessions() as db:
+                assert await _role_names(db) == {"Replica Only Role"}
+
+    asyncio.run(run())
+    assert not replica_set.healthy(broken.sync_engine)
+    asyncio.run(broken.dispose())
+
+
+def test_read_your_writes_after_create_user(replica, db):
+    replica_set = ReplicaSet([replica.sync_engine], cooldown=30)
+    original = AsyncSessionLocal.kw["info"]
+    AsyncSessionLocal.configure(info={"replicas": replica_set})
+    fresh_client = TestClient(app)
+    try:
+        suffix = uuid.uuid4().hex[:8]
+        created = client.post(
+            "/users/",
+            json={"username": f"ryw_{suffix}", "email": f"ryw_{suffix}@example.com", "password": "secret123"},
+        ).json()
+        # Just written: served from the primary although the replica has no such row
+        assert client.get(f"/users/{created['id']}").status_code == 200
+        assert fresh_client.get(f"/users/{created['id']}").status_code == 200
+        # A worker that did not see the write only has the writing client's cookie to go on
+        recent_writes.clear()
+        assert client.get(f"/users/{created['id']}").status_code == 200
+        assert fresh_client.get(f"/users/{created['id']}").status_code == 404
+
+        other = User(username=f"lagging_{suffix}", email=f"lagging_{suffix}@example.com")
+        db.add(other)
+        db.commit()
+        # Not written through the API, so the read goes to the (lagging) replica
+        assert fresh_client.get(f"/users/{other.id}").status_code == 404
+    finally:
+        AsyncSessionLocal.configure(info=original)
@@ -0,0 +1,60 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.core.responses import FastJSONResponse, ZeroCopyFileResponse
+from app.main import app
+from app.schemas.user import LoginResponse, UserRead
+
+client = TestClient(app)
+
+
+def test_fast_json_response_matches_stdlib_shapes():
+    response = FastJSONResponse({1: {"name": "view"}, "when": None})
+    assert response.body == b'{"1":{"name":"view"},"when":null}'
+
+
+def test_user_responses_match_their_schemas():
+    created = client.post("/users/", json={
+        "username": "fast-json-user",
+        "email": "fast-json-user@example.com",
+        "password": "secret-password",
+    })
+    assert created.status_code == 200
+    assert UserRead.model_validate(created.json()).username == "fast-json-user"
+
+    login = client.post("/users/login", json={"username": "fast-json-user", "password": "secret-password"})
+    body = LoginResponse.model_validate(login.json())
+    assert body.success is True
+    assert body.data.user.id == created.json()["id"]
+    assert body.data.token_type == "bearer"
+
+    fetched = client.get(f"/users/{created.json()['id']}")
+    assert fetched.json() == created.json()
+
+
+def _serve(response, extensions, headers=()):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": list(headers), "extensions": extensions}
+    asyncio.run(response(scope, None, send))
+    return messages
+
+
+def test_zero_copy_file_response_hands_the_file_to_the_server(tmp_path):
+    path = tmp_path / "image.bin"
+    path.write_bytes(b"0123456789")
+
+    ranged = _serve(ZeroCopyFileResponse(str(path), 10), {"http.response.zerocopy": {}}, [(b"range", b"bytes=2-5")])
+    assert ranged[0]["status"] == 206
+    assert (b"content-range", b"bytes 2-5/10") in ranged[0]["headers"]
+    assert (ranged[1]["type"], ranged[1]["offset"], ranged[1]["count"]) == ("http.response.zerocopy", 2, 4)
+
+    whole = _serve(ZeroCopyFileResponse(str(path), 10), {"http.response.pathsend": {}})
+    assert whole[1] == {"type": "http.response.pathsend", "path": str(path)}
+
+    mapped = _serve(ZeroCopyFileResponse(str(path), 10), {}, [(b"range", b"bytes=7-")])
+    assert b"".join(message["body"] for message in mapped[1:]) == b"789"
@@ -0,0 +1,77 @@
+import struct
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.telemetry as telemetry_api
+from app.main import app
+from app.services.telemetry_frame import (
+    COMPRESSION_DEFLATE,
+    COMPRESSION_NONE,
+    CONTENT_TYPE,
+    FrameError,
+    decode_frame,
+    encode_frame,
+    frame_readings,
+)
+from app.services.telemetry_ingest import TelemetryIngestor
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("compression", [COMPRESSION_NONE, COMPRESSION_DEFLATE])
+def test_frame_round_trip(compression):
+    body = encode_frame("lte-42", ["rssi", "rsrp"], [1000, 2000, 3000], [0, 1, 0], [-71.5, -98.0, -70.25], compression)
+    frame = decode_frame(body)
+    assert frame.device_id == "lte-42"
+    assert frame_readings(frame) == [
+        ("lte-42", "rssi", 1000, -71.5),
+        ("lte-42", "rsrp", 2000, -98.0),
+        ("lte-42", "rssi", 3000, -70.25),
+    ]
+
+
+def test_frame_is_much_smaller_than_json():
+    ts = np.arange(500, dtype=np.int64) * 5000
+    body = encode_frame("lte-42", ["rssi"], ts, np.zeros(500, dtype=np.uint8), np.full(500, -70.0), COMPRESSION_DEFLATE)
+    assert len(body) < 500 * 13 / 2
+
+
+def test_malformed_frames_are_rejected():
+    good = encode_frame("lte-42", ["rssi"], [1], [0], [1.0])
+    with pytest.raises(FrameError, match="Not a telemetry frame"):
+        decode_frame(b"JSON" + good[4:])
+    with pytest.raises(FrameError, match="version"):
+        decode_frame(good[:4] + bytes([9]) + good[5:])
+    with pytest.raises(FrameError, match="Expected 1 readings"):
+        decode_frame(good[:-1])
+    with pytest.raises(FrameError, match="undefined metric"):
+        decode_frame(encode_frame("lte-42", ["rssi"], [1], [3], [1.0]))
+    with pytest.raises(FrameError, match="finite"):
+        decode_frame(encode_frame("lte-42", ["rssi"], [1], [0], [float("nan")]))
+    # A deflate bomb cannot inflate past the declared reading count
+    bomb = bytearray(encode_frame("lte-42", ["rssi"], [1] * 1000, [0] * 1000, [0.0] * 1000, COMPRESSION_DEFLATE))
+    struct.pack_into("<I", bomb, 8, 10)
+    with pytest.raises(FrameError, match="Expected 10 readings"):
+        decode_frame(bytes(bomb))
+    # The declared count is capped before anything is inflated
+    struct.pack_into("<I", bomb, 8, 8_000_000)
+    with pytest.raises(FrameError, match="at most 10000"):
+        decode_frame(bytes(bomb), max_readings=10000)
+
+
+def test_frame_endpoint(monkeypatch, auth_headers):
+    ingestor = TelemetryIngestor(capacity=100, flush_rows=100, flush_interval=1)
+    monkeypatch.setattr(telemetry_api, "telemetry_ingestor", ingestor)
+    headers = {**auth_headers("Christie Admin"), "Content-Type": CONTENT_TYPE}
+    body = encode_frame("lte-7", ["rssi"], [1, 2], [0, 0], [-80.0, -81.0], COMPRESSION_DEFLATE)
+
+    response = client.post("/telemetry/frames", content=body, headers=headers)
+    assert response.status_code == 202
+    assert response.json() == {"accepted": 2}
+    assert ingestor.buffer.drain(10) == [("lte-7", "rssi", 1, -80.0), ("lte-7", "rssi", 2, -81.0)]
+
+    assert client.post("/telemetry/frames", content=b"garbage", headers=headers).status_code == 400
+    monkeypatch.setattr(telemetry_api.settings, "TELEMETRY_MAX_FRAME_BYTES", 16)
+    assert client.post("/telemetry/frames", content=body, headers=headers).status_code == 413
@@ -0,0 +1,87 @@
+import asyncio
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+import app.api.telemetry as telemetry_api
+from app.main import app
+from app.models.telemetry import TelemetryReading
+from app.services.telemetry_ingest import RingBuffer, TelemetryIngestor
+
+client = TestClient(app)
+
+
+def _count(db, device_id):
+    return db.scalar(select(func.count()).select_from(TelemetryReading).where(TelemetryReading.device_id == device_id))
+
+
+def test_ring_buffer_wraps_and_rejects_whole_batches():
+    buffer = RingBuffer(4)
+    assert buffer.offer([("d", "m", 1, 1.0), ("d", "m", 2, 2.0), ("d", "m", 3, 3.0)])
+    assert [reading[2] for reading in buffer.drain(2)] == [1, 2]
+    assert buffer.offer([("d", "m", 4, 4.0), ("d", "m", 5, 5.0), ("d", "m", 6, 6.0)])
+    assert not buffer.offer([("d", "m", 7, 7.0)])
+    assert [reading[2] for reading in buffer.drain(10)] == [3, 4, 5, 6]
+    assert len(buffer) == 0
+
+
+def test_background_flush_on_size_and_time(db):
+    device = f"dev-{uuid.uuid4().hex[:8]}"
+
+    async def run():
+        ingestor = TelemetryIngestor(capacity=100, flush_rows=5, flush_interval=60)
+        await ingestor.start()
+        ingestor.submit([(device, "temp", ts, 20.5) for ts in range(5)])
+        await asyncio.sleep(0.2)
+        by_size = _count(db, device)
+        ingestor.flush_interval = 0.05
+        ingestor.submit([(device, "temp", 5, 21.0)])
+        await asyncio.sleep(0.3)
+        ingestor.submit([(device, "temp", 6, 21.5)])
+        await ingestor.stop()
+        return by_size
+
+    # The first flush was woken by the size threshold long before the 60 s interval
+    assert asyncio.run(run()) == 5
+    db.expire_all()
+    assert _count(db, device) == 7
+
+
+def test_ingest_endpoint_accepts_and_applies_backpressure(monkeypatch, auth_headers, db):
+    ingestor = TelemetryIngestor(capacity=3, flush_rows=100, flush_interval=1)
+    monkeypatch.setattr(telemetry_api, "telemetry_ingestor", ingestor)
+    headers = auth_headers("Christie Admin")
+    readings = [{"device_id": "dev-api", "metric": "rssi", "ts_ms": 1_700_000_000_000 + i, "value": -70.0} for i in range(2)]
+
+    response = client.post("/telemetry/readings", json={"readings": readings}, headers=headers)
+    assert response.status_code == 202
+    assert response.json() == {"accepted": 2}
+
+    full = client.post("/telemetry/readings", json={"readings": readings}, headers=headers)
+    assert full.status_code == 429
+    assert full.headers["Retry-After"] == "1"
+
+    assert client.post("/telemetry/readings", json={"readings": readings}, headers=auth_headers("Client Cleaner")).status_code == 403
+    assert asyncio.run(ingestor.flush()) == 2
+
+
+def test_invalid_readings_are_dropped_without_blocking_the_batch(db):
+    device = f"dev-{uuid.uuid4().hex[:8]}"
+    ingestor = TelemetryIngestor(capacity=100, flush_rows=100, flush_interval=1)
+    readings = [(device, "temp", ts, 20.0 + ts) for ts in range(10)]
+    # SQLite stores NaN as NULL, which the NOT NULL constraint refuses
+    readings[3] = (device, "temp", 3, float("nan"))
+    ingestor.submit(readings)
+
+    assert asyncio.run(ingestor.flush()) == 9
+    assert ingestor.retrying == 0
+    assert _count(db, device) == 9
+
+
+def test_schema_rejects_non_finite_values_and_out_of_range_timestamps(auth_headers):
+    headers = auth_headers("Christie Admin")
+    headers["Content-Type"] = "application/json"
+    for reading in ('"ts_ms": 1, "value": NaN', '"ts_ms": 99999999999999999999, "value": 1.0'):
+        body = '{"readings": [{"device_id": "dev-bad", "metric": "rssi", %s}]}' % reading
+        assert client.post("/telemetry/readings", content=body, headers=headers).status_code == 422
@@ -0,0 +1,74 @@
+import uuid
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.telemetry import TelemetryReading
+from app.services.telemetry_query import bucket_aggregate, lttb, series_cache
+
+client = TestClient(app)
+
+
+def _seed(db, count):
+    device = f"dev-{uuid.uuid4().hex[:8]}"
+    rng = np.random.default_rng(7)
+    values = rng.normal(20, 3, count)
+    db.execute(TelemetryReading.__table__.insert(), [
+        {"device_id": device, "metric": "temp", "ts_ms": 1000 * i, "value": float(value)}
+        for i, value in enumerate(values)
+    ])
+    db.commit()
+    return device, values
+
+
+def test_bucket_aggregate_matches_per_bucket_reference():
+    ts = np.array([0, 1, 5, 6, 7, 19], dtype=np.int64)
+    values = np.array([3.0, 1.0, 4.0, 1.0, 5.0, 9.0])
+    series = bucket_aggregate(ts, values, start_ms=0, end_ms=20, points=4)
+    assert series["ts_ms"].tolist() == [0, 5, 15]
+    assert series["min"].tolist() == [1.0, 1.0, 9.0]
+    assert series["max"].tolist() == [3.0, 5.0, 9.0]
+    assert series["mean"].tolist() == [2.0, 10 / 3, 9.0]
+    assert series["last"].tolist() == [1.0, 5.0, 9.0]
+    assert series["count"].tolist() == [2, 3, 1]
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    ts = np.arange(1000, dtype=np.int64)
+    values = np.zeros(1000)
+    values[500] = 100.0
+    series = lttb(ts, values, 20)
+    assert len(series["ts_ms"]) == 20
+    assert series["ts_ms"][0] == 0 and series["ts_ms"][-1] == 999
+    assert 100.0 in series["value"]
+
+
+def test_series_endpoint_downsamples_and_caches(db, auth_headers, query_budget):
+    series_cache.clear()
+    device, values = _seed(db, 2000)
+    headers = auth_headers("Service Technician")
+    params = {"metric": "temp", "start_ms": 0, "end_ms": 2_000_000, "points": 100}
+
+    response = client.get(f"/telemetry/devices/{device}/series", params=params, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["raw_points"] == 2000
+    assert len(body["ts_ms"]) == 100
+    assert sum(body["count"]) == 2000
+    assert body["max"][0] == max(values[:20])
+    assert abs(body["mean"][-1] - values[-20:].mean()) < 1e-9
+
+    with query_budget(0):
+        cached = client.get(f"/telemetry/devices/{device}/series", params=params, headers=headers)
+    assert cached.content == response.content
+
+    shape = client.get(f"/telemetry/devices/{device}/series", params={**params, "method": "lttb"}, headers=headers).json()
+    assert len(shape["value"]) == 100
+    assert shape["ts_ms"][0] == 0 and shape["ts_ms"][-1] == 1_999_000
+
+
+def test_series_endpoint_requires_view_and_valid_range(auth_headers):
+    params = {"metric": "temp", "start_ms": 10, "end_ms": 10}
+    assert client.get("/telemetry/devices/x/series", params=params, headers=auth_headers("Client Cleaner")).status_code == 403
+    assert client.get("/telemetry/devices/x/series", params=params, headers=auth_headers("Christie Admin")).status_code == 400
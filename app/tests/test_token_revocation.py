@@ -0,0 +1,113 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from app.api.deps import invalidate_user
+from app.db.session import AsyncSessionLocal
+from app.main import app
+from app.models.token import RevokedToken
+from app.models.user import User
+from app.services.token_revocation import BloomFilter, RevocationStore, revocation_store
+
+client = TestClient(app)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(num_bits=4096, num_hashes=5)
+    keys = [f"jti-{i}" for i in range(200)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+
+
+def test_store_forgets_expired_revocations():
+    store = RevocationStore(bloom_bits=4096, bloom_hashes=5, prune_interval=60)
+    now = time.time()
+    assert store.mark_revoked("short", now + 0.01)
+    assert store.mark_revoked("long", now + 3600)
+    assert not store.mark_revoked("long", now + 3600)
+    store.purge(now=now + 1)
+    assert len(store) == 1
+    assert not store.is_revoked("short")
+    assert store.is_revoked("long")
+
+
+def _login(username):
+    client.post("/users/", json={"username": username, "email": f"{username}@example.com", "password": "secret-password"})
+    response = client.post("/users/login", json={"username": username, "password": "secret-password"})
+    return response.json()["data"]["refresh_token"]
+
+
+def test_refresh_token_rotates_and_persists(db):
+    old_token = _login("rotating-user")
+
+    response = client.post("/users/refresh", params={"refresh_token": old_token})
+    assert response.json()["success"] is True
+    new_token = response.json()["data"]["refresh_token"]
+    assert new_token != old_token
+
+    replay = client.post("/users/refresh", params={"refresh_token": old_token})
+    assert replay.json() == {"success": False, "message": "Refresh token has been revoked", "data": None}
+    assert db.query(RevokedToken).count() >= 1
+
+    restored = RevocationStore(bloom_bits=4096, bloom_hashes=5, prune_interval=60)
+
+    async def load():
+        async with AsyncSessionLocal() as session:
+            await restored.load(session)
+    asyncio.run(load())
+    assert len(restored) == db.query(RevokedToken).count()
+
+    assert client.post("/users/refresh", params={"refresh_token": new_token}).json()["success"] is True
+
+
+def test_refresh_for_inactive_user_does_not_burn_the_token(db):
+    token = _login("paused-user")
+    user = db.query(User).filter_by(username="paused-user").one()
+    user.is_active = False
+    db.commit()
+    invalidate_user(user.id)
+    rejected = client.post("/users/refresh", params={"refresh_token": token}).json()
+    assert rejected["message"] == "User not found or inactive"
+
+    user.is_active = True
+    db.commit()
+    invalidate_user(user.id)
+    assert client.post("/users/refresh", params={"refresh_token": token}).json()["success"] is True
+
+
+def test_failed_commit_leaves_token_usable(monkeypatch):
+    store = RevocationStore(bloom_bits=4096, bloom_hashes=5, prune_interval=60)
+
+    async def revoke():
+        async with AsyncSessionLocal() as session:
+            async def broken_commit():
+                raise OperationalError("COMMIT", {}, Exception("database is locked"))
+            monkeypatch.setattr(session, "commit", broken_commit)
+            with pytest.raises(OperationalError):
+                await store.revoke(session, "uncommitted-jti", time.time() + 60)
+    asyncio.run(revoke())
+    assert not store.is_revoked("uncommitted-jti")
+
+
+def test_revocation_from_another_worker_is_rejected(db):
+    db.add(RevokedToken(jti="other-worker-jti", expires_at=datetime.utcnow() + timedelta(hours=1)))
+    db.commit()
+    store = RevocationStore(bloom_bits=4096, bloom_hashes=5, prune_interval=60)
+
+    async def revoke():
+        async with AsyncSessionLocal() as session:
+            return await store.revoke(session, "other-worker-jti", time.time() + 3600)
+    assert asyncio.run(revoke()) is False
+    assert store.is_revoked("other-worker-jti")
+
+
+def test_lifespan_loads_persisted_revocations(db):
+    db.add(RevokedToken(jti="persisted-jti", expires_at=datetime.utcnow() + timedelta(hours=1)))
+    db.commit()
+    with TestClient(app):
+        assert revocation_store.is_revoked("persisted-jti")
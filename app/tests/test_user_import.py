@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.hashing import password_hasher
+from app.main import app
+from app.models.user import Role, User
+
+client = TestClient(app)
+
+
+def _results(response):
+    return sorted((json.loads(line) for line in response.text.splitlines()), key=lambda result: result["row"])
+
+
+@pytest.mark.timeout(30)
+def test_bulk_import_ndjson_reports_each_row(db, auth_headers):
+    rows = [
+        {"username": "bulk-1", "email": "bulk-1@example.com", "password": "secret-password"},
+        {"username": "bulk-2", "email": "bulk-2@example.com", "password": "secret-password", "full_name": "Bulk Two"},
+        {"username": "bulk-3", "email": "bulk-1@example.com", "password": "secret-password"},
+        {"username": "bulk-4", "email": "not-an-email", "password": "secret-password"},
+        {"username": "bulk-5", "email": "bulk-5@example.com", "password": "short"},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\n{broken\n"
+    response = client.post("/users/bulk", content=body, headers={**auth_headers("Christie Admin"), "Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    lines = [json.loads(line)["row"] for line in response.text.splitlines()]
+    # Rejected rows are reported as they are read, before the chunk they were in is written
+    assert lines[:3] == [4, 5, 6]
+    results = _results(response)
+    assert [r["row"] for r in results] == [1, 2, 3, 4, 5, 6]
+    assert [r["status"] for r in results] == ["created", "created", "error", "error", "error", "error"]
+    assert results[2]["error"] == "Email already registered"
+    assert results[5]["error"].startswith("Malformed row")
+    assert db.query(User).filter(User.username.in_(["bulk-1", "bulk-2"])).count() == 2
+
+
+@pytest.mark.timeout(30)
+def test_bulk_import_csv_skips_existing_users(auth_headers):
+    headers = {**auth_headers("Christie Admin"), "Content-Type": "text/csv"}
+    body = (
+        "username,email,password,full_name\n"
+        "csv-1,csv-1@example.com,secret-password,CSV One\n"
+        "csv-2,csv-2@example.com,secret-password,\n"
+    )
+    first = _results(client.post("/users/bulk", content=body, headers=headers))
+    assert [r["status"] for r in first] == ["created", "created"]
+    second = _results(client.post("/users/bulk", content=body, headers=headers))
+    assert [r["error"] for r in second] == ["Email already registered"] * 2
+
+
+@pytest.mark.timeout(30)
+def test_bulk_import_csv_quoted_field_spans_lines(db, auth_headers):
+    body = (
+        "username,email,password,full_name\n"
+        'csv-multi,csv-multi@example.com,secret-password,"Line one\nline two, with comma"\n'
+        "csv-after,csv-after@example.com,secret-password,After\n"
+    )
+    results = _results(client.post("/users/bulk", content=body, headers={**auth_headers("Christie Admin"), "Content-Type": "text/csv"}))
+    assert [(r["row"], r["status"]) for r in results] == [(1, "created"), (2, "created")]
+    user = db.query(User).filter_by(username="csv-multi").one()
+    assert user.full_name == "Line one\nline two, with comma"
+
+
+@pytest.mark.timeout(30)
+def test_bulk_import_reports_saturated_hasher_per_row(monkeypatch, auth_headers):
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    body = json.dumps({"username": "busy-bulk", "email": "busy-bulk@example.com", "password": "secret-password"})
+    response = client.post("/users/bulk", content=body, headers=auth_headers("Christie Admin"))
+    assert response.status_code == 200
+    assert _results(response) == [{"row": 1, "status": "error", "error": "Server is busy, retry this row"}]
+
+
+@pytest.mark.timeout(30)
+def test_bulk_import_requires_permission_and_known_roles(db, auth_headers):
+    admin_role = db.query(Role).filter_by(name="Christie Admin").one().id
+    rows = [
+        {"username": "role-ok", "email": "role-ok@example.com", "password": "secret-password", "role_id": admin_role},
+        {"username": "role-bad", "email": "role-bad@example.com", "password": "secret-password", "role_id": 999999},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows)
+    assert client.post("/users/bulk", content=body).status_code == 401
+    assert client.post("/users/bulk", content=body, headers=auth_headers("Client Cleaner")).status_code == 403
+    results = _results(client.post("/users/bulk", content=body, headers=auth_headers("Christie Admin")))
+    assert [r["status"] for r in results] == ["created", "error"]
+    assert results[1]["error"] == "Unknown role"
@@ -0,0 +1,50 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.user import Role, User
+
+client = TestClient(app)
+
+
+def _seed_users(db, prefix, count, role_name):
+    role_id = db.query(Role).filter_by(name=role_name).first().id
+    db.add_all([
+        User(username=f"{prefix}-{i}", email=f"{prefix}-{i}@example.com", hashed_password="x",
+             is_active=i % 3 != 0, role_id=role_id)
+        for i in range(count)
+    ])
+    db.commit()
+    return role_id
+
+
+def test_keyset_pages_cover_every_user_once(db):
+    role_id = _seed_users(db, "page", 12, "Client Technician")
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 5, "role_id": role_id}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/users/", params=params).json()
+        seen.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 12
+    assert seen == sorted(set(seen))
+
+
+def test_listing_filters_and_rejects_bad_cursor(db):
+    role_id = _seed_users(db, "filter", 6, "Service Technician")
+    body = client.get("/users/", params={"role_id": role_id, "is_active": False}).json()
+    assert [item["username"] for item in body["items"]] == ["filter-0", "filter-3"]
+    assert client.get("/users/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_ndjson_export_streams_all_matching_users(db):
+    role_id = _seed_users(db, "export", 7, "Client Admin")
+    response = client.get("/users/", params={"format": "ndjson", "role_id": role_id})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["username"] for row in rows] == [f"export-{i}" for i in range(7)]
@@ -0,0 +1,273 @@
+"""Benchmark the hot API paths in-process (httpx ASGI transport) or through a local uvicorn.
+
+Examples::
+
+    python -m benchmarks.run                              # SQLite, in-process
+    python -m benchmarks.run --target uvicorn --save benchmarks/baselines/sqlite.json
+    BENCH_POSTGRES_URL=postgresql://... python -m benchmarks.run --database postgres
+    python -m benchmarks.run --compare benchmarks/baselines/sqlite.json
+
+Each scenario reports throughput, p50/p95/p99 latency and SQL statements
+per request. ``--compare`` exits non-zero when a scenario regressed beyond
+``--tolerance`` against a saved baseline.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List
+
+
+def configure_database(database: str) -> str:
+    """Point the app at the benchmark database; must run before ``app`` is imported."""
+    if database == "postgres":
+        url = os.environ.get("BENCH_POSTGRES_URL")
+        if not url:
+            sys.exit("Set BENCH_POSTGRES_URL to a disposable PostgreSQL database to benchmark postgres")
+    else:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='fastapi-bench-'), 'bench.db')}"
+    os.environ["DATABASE_URL"] = url
+    return url
+
+
+def configure_rate_limits() -> None:
+    """Keep the login limiter in the measured path but out of the way; must run before ``app`` is imported.
+
+    Setup and the login scenario sign in as one user from one address far more
+    often than the production limits allow. Explicit environment settings win.
+    """
+    for name in ("LOGIN_RATE_LIMIT_PER_USERNAME", "LOGIN_RATE_LIMIT_PER_IP"):
+        os.environ.setdefault(name, str(10**9))
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        self._engine = engine
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+        event.listen(self._engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+        event.remove(self._engine, "before_cursor_execute", self._before_cursor_execute)
+
+
+async def measure(name: str, requests: int, concurrency: int, call: Callable[[int], Awaitable[None]], counter) -> dict:
+    latencies: List[float] = []
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            await call(index)
+            latencies.append(time.perf_counter() - start)
+
+    queries_before = counter.count
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    result = {
+        "requests": requests,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "queries_per_request": (counter.count - queries_before) / requests if requests else 0.0,
+    }
+    print(
+        f"{name:<22} {result['throughput_rps']:>9.1f} req/s  p50 {result['p50_ms']:>8.2f} ms  "
+        f"p95 {result['p95_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  "
+        f"{result['queries_per_request']:>5.2f} q/req"
+    )
+    return result
+
+
+def _expect(response, status: int = 200):
+    if response.status_code != status:
+        raise RuntimeError(f"{response.request.method} {response.request.url} -> {response.status_code}: {response.text[:200]}")
+    return response
+
+
+async def run_scenarios(client, counter, args) -> Dict[str, dict]:
+    password = "bench-password"
+    _expect(await client.post("/users/", json={"username": "bench", "email": "bench@example.com", "password": password}))
+    login_body = {"username": "bench", "password": password}
+    user = _expect(await client.post("/users/login", json=login_body)).json()["data"]
+    user_id = user["user"]["id"]
+    roles = _expect(await client.get("/users/roles/")).json()
+    admin_id = next(role["role_id"] for role in roles if role["role_name"] == "Christie Admin")
+
+    # Refresh tokens rotate, so each in-flight request takes a chain from the pool and returns its successor
+    refresh_chains: asyncio.Queue = asyncio.Queue()
+    for _ in range(args.concurrency):
+        refresh_chains.put_nowait(_expect(await client.post("/users/login", json=login_body)).json()["data"]["refresh_token"])
+
+    async def refresh(index):
+        token = await refresh_chains.get()
+        body = _expect(await client.post("/users/refresh", params={"refresh_token": token})).json()
+        if not body["success"]:
+            raise RuntimeError(f"refresh failed: {body['message']}")
+        refresh_chains.put_nowait(body["data"]["refresh_token"])
+
+    auth_requests = args.auth_requests
+    scenarios = {
+        "login": (auth_requests, lambda i: client.post("/users/login", json=login_body)),
+        "refresh_token": (args.requests, refresh),
+        "create_user": (auth_requests, lambda i: client.post("/users/", json={
+            "username": f"bench-new-{i}", "email": f"bench-new-{i}@example.com", "password": password,
+        })),
+        "get_user": (args.requests, lambda i: client.get(f"/users/{user_id}")),
+        "get_role_permissions": (args.requests, lambda i: client.get(f"/users/role/{admin_id}/permissions/")),
+        "list_roles": (args.requests, lambda i: client.get("/users/roles/")),
+        "list_modules": (args.requests, lambda i: client.get("/users/modules/")),
+        "list_resources": (args.requests, lambda i: client.get("/users/resources/")),
+        "list_permissions": (args.requests, lambda i: client.get("/users/permissions/")),
+    }
+    selected = args.scenario or list(scenarios)
+    results = {}
+    for name in selected:
+        requests, call = scenarios[name]
+
+        async def checked(index, call=call):
+            response = await call(index)
+            if response is not None:
+                _expect(response)
+
+        results[name] = await measure(name, requests, args.concurrency, checked, counter)
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def bench(args) -> dict:
+    import httpx
+    from app.db import seed_rbac
+    from app.db.session import async_engine, engine
+    from app.main import app
+    from app.models.user import Base
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    seed_rbac()
+
+    counter = QueryCounter(async_engine.sync_engine)
+    with counter:
+        if args.target == "uvicorn":
+            import uvicorn
+            port = _free_port()
+            server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+            thread = threading.Thread(target=server.run, daemon=True)
+            thread.start()
+            while not server.started:
+                await asyncio.sleep(0.05)
+            try:
+                async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+                    results = await run_scenarios(client, counter, args)
+            finally:
+                server.should_exit = True
+                thread.join()
+        else:
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                    results = await run_scenarios(client, counter, args)
+    return results
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, base in baseline["results"].items():
+        result = current["results"].get(name)
+        if result is None:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']:.2f} ms vs baseline {base['p95_ms']:.2f} ms")
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['throughput_rps']:.1f} req/s vs baseline {base['throughput_rps']:.1f} req/s")
+        if result["queries_per_request"] > base["queries_per_request"] + 1e-9:
+            regressions.append(
+                f"{name}: {result['queries_per_request']:.2f} queries/request vs baseline {base['queries_per_request']:.2f}"
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--database", choices=["sqlite", "postgres"], default="sqlite")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--auth-requests", type=int, default=20, help="requests for the bcrypt-bound scenarios")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--scenario", action="append", help="run only this scenario (repeatable)")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    database_url = configure_database(args.database)
+    configure_rate_limits()
+    results = asyncio.run(bench(args))
+    report = {
+        "meta": {
+            "target": args.target,
+            "database": args.database,
+            "database_url": database_url.split("@")[-1],
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Saved baseline to {args.save}")
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        for key in ("target", "database", "concurrency"):
+            if baseline["meta"].get(key) != report["meta"][key]:
+                print(f"Warning: baseline {key}={baseline['meta'].get(key)!r} differs from this run ({report['meta'][key]!r})")
+        regressions = compare(baseline, report, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Measure how long a fresh worker takes to boot and answer its first request.
+
+Examples::
+
+    python -m benchmarks.startup                  # 10 cold starts against SQLite
+    python -m benchmarks.startup --runs 20 --save benchmarks/baselines/startup.json
+    python -m benchmarks.startup --compare benchmarks/baselines/startup.json
+    python -m benchmarks.startup --imports 15     # also list the slowest imports
+
+Every run spawns a new interpreter, so module caches never carry over. Each
+run reports the cold ``import app.main``, the lifespan startup (engines,
+hasher pool, revocation load) and the first ``GET /``; ``--compare`` exits
+non-zero when the median time to first response regressed beyond
+``--tolerance``.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+import asyncio
+import httpx
+
+async def first_response():
+    application = app.main.create_app()
+    async with application.router.lifespan_context(application):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            response = await client.get("/")
+        response.raise_for_status()
+        return started, time.perf_counter()
+
+started, answered = asyncio.run(first_response())
+print((imported - start) * 1000, (started - imported) * 1000, (answered - started) * 1000)
+"""
+
+PHASES = ("import_ms", "startup_ms", "first_request_ms", "process_ms")
+
+
+def prepare_database() -> Dict[str, str]:
+    from sqlalchemy import create_engine
+
+    import app.models  # noqa: F401
+    from app.models.user import Base
+
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='fastapi-startup-'), 'startup.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return {**os.environ, "DATABASE_URL": url, "PYTHONDONTWRITEBYTECODE": "1"}
+
+
+def cold_start(env: Dict[str, str]) -> Dict[str, float]:
+    began = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    process_ms = (time.perf_counter() - began) * 1000
+    import_ms, startup_ms, first_request_ms = (float(value) for value in output.split()[-3:])
+    return {
+        "import_ms": import_ms,
+        "startup_ms": startup_ms,
+        "first_request_ms": first_request_ms,
+        "process_ms": process_ms,
+    }
+
+
+def slowest_imports(env: Dict[str, str], limit: int) -> List[str]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    rows.sort(reverse=True)
+    return [f"{self_us / 1000:8.1f} ms self {cumulative / 1000:8.1f} ms cumulative  {module}" for self_us, cumulative, module in rows[:limit]]
+
+
+def summarize(samples: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        phase: {
+            "median": statistics.median(sample[phase] for sample in samples),
+            "min": min(sample[phase] for sample in samples),
+            "max": max(sample[phase] for sample in samples),
+        }
+        for phase in PHASES
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--imports", type=int, default=0, help="list this many of the slowest imports")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    env = prepare_database()
+    samples = [cold_start(env) for _ in range(args.runs)]
+    results = summarize(samples)
+    for phase in PHASES:
+        stats = results[phase]
+        print(f"{phase:<18} median {stats['median']:8.1f}  min {stats['min']:8.1f}  max {stats['max']:8.1f}")
+    if args.imports:
+        print("Slowest imports:")
+        for line in slowest_imports(env, args.imports):
+            print(f"  {line}")
+
+    report = {
+        "meta": {
+            "runs": args.runs,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Saved baseline to {args.save}")
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)["results"]
+        current = results["process_ms"]["median"]
+        previous = baseline["process_ms"]["median"]
+        if current > previous * (1 + args.tolerance):
+            print(f"Regression: time to first response {current:.1f} ms vs baseline {previous:.1f} ms")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Compare wire size and decode cost of JSON and binary telemetry batches.
+
+Examples::
+
+    python -m benchmarks.telemetry_frames
+    python -m benchmarks.telemetry_frames --readings 1000 --repeat 500
+
+For each encoding it reports bytes per batch and per reading, and the time
+to turn the request body into ingestor rows: ``TelemetryBatch`` validation
+for JSON, ``decode_frame`` plus ``frame_readings`` for frames.
+"""
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+import numpy as np
+
+
+def _time(fn: Callable[[], object], repeat: int) -> float:
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readings", type=int, default=200, help="readings per batch")
+    parser.add_argument("--metrics", type=int, default=4, help="distinct metrics in the batch")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    from app.schemas.telemetry import TelemetryBatch
+    from app.services.telemetry_frame import (
+        COMPRESSION_DEFLATE,
+        COMPRESSION_NONE,
+        COMPRESSION_ZSTD,
+        FrameError,
+        decode_frame,
+        encode_frame,
+        frame_readings,
+    )
+
+    rng = np.random.default_rng(1)
+    device = "lte-000123"
+    metrics = [f"metric_{i}" for i in range(args.metrics)]
+    ts = 1_700_000_000_000 + np.arange(args.readings, dtype=np.int64) * 5000
+    metric_index = np.arange(args.readings) % args.metrics
+    values = np.round(rng.normal(-75, 5, args.readings), 1).astype(np.float32)
+
+    json_body = json.dumps({"readings": [
+        {"device_id": device, "metric": metrics[m], "ts_ms": int(t), "value": float(v)}
+        for t, m, v in zip(ts, metric_index, values)
+    ]}).encode()
+    cases = [
+        ("json", json_body, lambda body: [
+            (r.device_id, r.metric, r.ts_ms, r.value) for r in TelemetryBatch.model_validate_json(body).readings
+        ]),
+        ("json+gzip", gzip.compress(json_body), lambda body: [
+            (r.device_id, r.metric, r.ts_ms, r.value)
+            for r in TelemetryBatch.model_validate_json(gzip.decompress(body)).readings
+        ]),
+    ]
+    for name, compression in (("frame", COMPRESSION_NONE), ("frame+deflate", COMPRESSION_DEFLATE), ("frame+zstd", COMPRESSION_ZSTD)):
+        try:
+            body = encode_frame(device, metrics, ts, metric_index, values, compression)
+        except FrameError as exc:
+            print(f"{name:<14} skipped: {exc}")
+            continue
+        cases.append((name, body, lambda body: frame_readings(decode_frame(body))))
+
+    print(f"{args.readings} readings, {args.metrics} metrics, median of {args.repeat} decodes")
+    print(f"{'encoding':<14} {'bytes':>8} {'B/reading':>10} {'decode µs':>10} {'µs/reading':>11}")
+    for name, body, decode in cases:
+        seconds = _time(lambda: decode(body), args.repeat)
+        print(
+            f"{name:<14} {len(body):>8} {len(body) / args.readings:>10.1f} "
+            f"{seconds * 1e6:>10.1f} {seconds * 1e6 / args.readings:>11.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())